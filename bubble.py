@@ -1,8 +1,10 @@
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
-from dash import Dash, dcc, html, callback, Input, Output
+import numpy as np
+from dash import Dash, dcc, html, callback, clientside_callback, Input, Output, Patch
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import webbrowser
 
 # Load dataset
 df = pd.read_csv("https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2025/week-5/Steam%20Top%20100%20Played%20Games%20-%20List.csv")
@@ -13,21 +15,122 @@ df["Price"] = df["Price"].astype(str).str.replace("\u00a3", "", regex=False).ast
 df["Current Players"] = df["Current Players"].str.replace(",", "").astype(int)
 df["Peak Today"] = df["Peak Today"].str.replace(",", "").astype(int)
 
-# Keep only the top 10 games by Current Players
-df = df.nlargest(50, "Current Players")
+# Row of every game by name and by Steam app id (parsed from the store link); the first row wins on duplicates
+first_names = df["Name"].drop_duplicates()
+name_rows = dict(zip(first_names, first_names.index))
+app_ids = pd.to_numeric(df["Store Link"].str.extract(r"/app/(\d+)", expand=False), errors="coerce").dropna().astype(int)
+first_app_ids = app_ids.drop_duplicates()
+app_id_rows = dict(zip(first_app_ids, first_app_ids.index))
+
+# Rows with the smallest and largest value of every numeric column, found in one pass
+# (columns without any value, such as empty trailing spreadsheet columns, have no extremes)
+numeric_columns = df.select_dtypes("number").columns
+numeric_columns = numeric_columns[df[numeric_columns].notna().any().to_numpy()]
+numeric_values = df[numeric_columns].to_numpy(dtype=float)
+extreme_rows = {
+    column: (df.index[low], df.index[high])
+    for column, low, high in zip(numeric_columns, np.nanargmin(numeric_values, axis=0), np.nanargmax(numeric_values, axis=0))
+}
+
+# Look up a game by name or app id without scanning the frame (for detail panels; clicks open the store clientside)
+def game_row(name=None, app_id=None):
+    row = name_rows.get(name) if name is not None else app_id_rows.get(app_id)
+    return None if row is None else df.loc[row]
+
+# Largest number of bubbles drawn at once; views holding more games show density markers on a
+# DENSITY_GRID x DENSITY_GRID grid over the viewport, plus the TOP_GAMES most played games as bubbles
+POINT_BUDGET = 5000
+DENSITY_GRID = 32
+TOP_GAMES = 50
+GRID_SIZE = 1024
+
+# Fine uniform grid over (Price, log Current Players), so the few heavily played games do not squeeze
+# the long tail into one row; rows are sorted by cell, so every cell is a slice of cell_order
+prices = df["Price"].to_numpy(dtype=float)
+players = df["Current Players"].to_numpy(dtype=float)
+log_players = np.log1p(players)
+x_edges = np.linspace(prices.min(), prices.max(), GRID_SIZE + 1)
+y_edges = np.linspace(log_players.min(), log_players.max(), GRID_SIZE + 1)
+
+def grid_cells(values, edges):
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, GRID_SIZE - 1)
+
+cell_ids = grid_cells(log_players, y_edges) * GRID_SIZE + grid_cells(prices, x_edges)
+cell_order = np.argsort(cell_ids, kind='stable')
+cell_offsets = np.r_[0, np.cumsum(np.bincount(cell_ids, minlength=GRID_SIZE * GRID_SIZE))]
+
+# Bubble data sent to the browser per game
+peaks = df["Peak Today"].to_numpy()
+point_customdata = df[["Name", "Store Link"]].to_numpy()
+
+# Rows of the games inside a viewport
+def viewport_rows(x0, x1, y0, y1):
+    cx0, cx1 = grid_cells(np.array([x0, x1]), x_edges)
+    cy0, cy1 = grid_cells(np.log1p(np.maximum([y0, y1], 0)), y_edges)
+
+    # Cells of one grid row are contiguous, so each row of the viewport is a single slice
+    rows = np.concatenate([
+        cell_order[cell_offsets[start + cx0]:cell_offsets[start + cx1 + 1]]
+        for start in np.arange(cy0, cy1 + 1) * GRID_SIZE
+    ])
+    inside = (prices[rows] >= x0) & (prices[rows] <= x1) & (players[rows] >= y0) & (players[rows] <= y1)
+    return np.sort(rows[inside])
+
+# Density markers for the games of a viewport: centroid and count of every occupied bin of a
+# grid laid over the viewport itself (log scale for players), so the bins shrink as the user zooms
+def density_bins(rows, x0, x1, y0, y1):
+    ly0, ly1 = np.log1p(max(y0, 0)), np.log1p(max(y1, 0))
+    bx = np.clip(((prices[rows] - x0) / ((x1 - x0) or 1) * DENSITY_GRID).astype(int), 0, DENSITY_GRID - 1)
+    by = np.clip(((log_players[rows] - ly0) / ((ly1 - ly0) or 1) * DENSITY_GRID).astype(int), 0, DENSITY_GRID - 1)
+    bins = by * DENSITY_GRID + bx
+    counts = np.bincount(bins, minlength=DENSITY_GRID * DENSITY_GRID)
+    occupied = counts > 0
+    centroid_x = np.bincount(bins, weights=prices[rows], minlength=DENSITY_GRID * DENSITY_GRID)[occupied]
+    centroid_y = np.bincount(bins, weights=players[rows], minlength=DENSITY_GRID * DENSITY_GRID)[occupied]
+    counts = counts[occupied]
+    return centroid_x / counts, centroid_y / counts, counts
+
+# Trace updates for a viewport: the games inside it, or density markers and the most played games when it holds too many
+def viewport_traces(x_range, y_range):
+    x0, x1 = sorted(x_range)
+    y0, y1 = sorted(y_range)
+    points = viewport_rows(x0, x1, y0, y1)
+
+    if len(points) > POINT_BUDGET:
+        density_x, density_y, density_counts = density_bins(points, x0, x1, y0, y1)
+        points = np.sort(points[np.argpartition(-players[points], TOP_GAMES)[:TOP_GAMES]])
+    else:
+        density_x = density_y = density_counts = np.empty(0)
+
+    point_trace = dict(
+        x=prices[points], y=players[points], customdata=point_customdata[points],
+        marker=dict(size=peaks[points], color=prices[points])
+    )
+    density_trace = dict(
+        x=density_x, y=density_y, text=density_counts,
+        marker=dict(size=density_counts, sizeref=2 * max(density_counts.max(initial=0), 1) / 40 ** 2)
+    )
+    return point_trace, density_trace
+
+# Copy nested trace updates into a Patch without replacing the other marker settings
+def patch_trace(patched_trace, update):
+    for key, value in update.items():
+        if isinstance(value, dict):
+            patch_trace(patched_trace[key], value)
+        else:
+            patched_trace[key] = value
 
 # Get the max and min values for annotation
-max_price_row = df.loc[df["Price"].idxmax()]
-min_price_row = df.loc[df["Price"].idxmin()]
-max_players_row = df.loc[df["Current Players"].idxmax()]
-min_players_row = df.loc[df["Current Players"].idxmin()]
+min_price_row, max_price_row = (df.loc[row] for row in extreme_rows["Price"])
+min_players_row, max_players_row = (df.loc[row] for row in extreme_rows["Current Players"])
 
-# Create scatter plot
+# Create scatter plot, drawn with WebGL so the whole catalog stays responsive
 fig = px.scatter(
     df, x="Price", y="Current Players", size="Peak Today", color="Price",
-    hover_data=["Name", "Price"],  # Add the game names as text
+    hover_data={"Name": True, "Price": True, "Store Link": False},  # Add the game names as text; the store link rides along in customdata
     size_max=70,
-    color_continuous_scale="Plasma"
+    color_continuous_scale="Plasma",
+    render_mode="webgl"
 )
 
 # Customize text positioning to be above the bubbles
@@ -37,6 +140,19 @@ fig.update_traces(
     textfont_color="black"
 )
 
+# Density markers for zoomed-out views, sized by the number of games in the cell
+fig.add_trace(go.Scattergl(
+    x=[], y=[], mode="markers", name="Games",
+    marker=dict(color="grey", opacity=0.6, sizemode="area", sizemin=4),
+    hovertemplate="%{text} games<extra></extra>",
+    showlegend=False
+))
+
+# Start from the full extent of the data
+point_trace, density_trace = viewport_traces([prices.min(), prices.max()], [players.min(), players.max()])
+fig.data[0].update(point_trace)
+fig.data[1].update(density_trace)
+
 # Add annotations for max and min values
 fig.update_layout(
     annotations=[
@@ -110,7 +226,9 @@ fig.update_layout(
         #gridcolor='lightgrey',  # Set gridline color to grey
     ),
     xaxis_title="Price (in GBP)",
-    title="Current Players vs. Price of Top 50 Steam Games"
+    title="Current Players vs. Price of Steam Games",
+    coloraxis=dict(cmin=prices.min(), cmax=prices.max()),  # Keep the colors fixed while the visible games change
+    uirevision="steam"  # Keep the user's zoom when the traces are patched
 )
 
 # Dash app setup with Bootstrap theme
@@ -120,7 +238,7 @@ app.layout = dbc.Container(
         dbc.Row(
             [
                 dbc.Col(
-                    html.H1('Steam Top 50 Played Games'),
+                    html.H1('Steam Most Played Games'),
                 ),
             ],
             justify="center",
@@ -157,18 +275,57 @@ app.layout = dbc.Container(
     }
 )
 
-@callback(
+# Open the store page of the clicked bubble in the user's browser; the figure is left untouched
+clientside_callback(
+    """
+    function(clickData) {
+        if (clickData && clickData.points && clickData.points.length) {
+            const customdata = clickData.points[0].customdata;
+            const link = customdata && customdata[1];
+            if (link) {
+                window.open(link, '_blank', 'noopener');
+            }
+        }
+        return window.dash_clientside.no_update;
+    }
+    """,
     Output('scatter-fig', 'figure'),
-    Input('scatter-fig', 'clickData')
+    Input('scatter-fig', 'clickData'),
+    prevent_initial_call=True
 )
-def open_link(clickData):
-    if clickData:
-        point = clickData['points'][0]
-        game_name = point['customdata'][0]
-        game_row = df[df['Name'] == game_name]
-        if not game_row.empty and 'Store Link' in game_row.columns:
-            webbrowser.open(game_row.iloc[0]['Store Link'])
-    return fig
+
+# Send only the games inside the zoomed or panned viewport
+@callback(
+    Output('scatter-fig', 'figure', allow_duplicate=True),
+    Input('scatter-fig', 'relayoutData'),
+    prevent_initial_call=True
+)
+def update_viewport(relayoutData):
+    if not relayoutData:
+        raise PreventUpdate
+
+    # Axis ranges after the relayout; autorange, or an axis the relayout leaves alone,
+    # falls back to the full extent, which can only let extra games in
+    ranges = []
+    for axis, full_range in (('xaxis', [prices.min(), prices.max()]), ('yaxis', [players.min(), players.max()])):
+        if f'{axis}.range[0]' in relayoutData:
+            ranges.append([relayoutData[f'{axis}.range[0]'], relayoutData[f'{axis}.range[1]']])
+        elif f'{axis}.range' in relayoutData:
+            ranges.append(relayoutData[f'{axis}.range'])
+        elif relayoutData.get(f'{axis}.autorange'):
+            ranges.append(full_range)
+        else:
+            ranges.append(None)
+    if ranges == [None, None]:
+        raise PreventUpdate
+    x_range = ranges[0] or [prices.min(), prices.max()]
+    y_range = ranges[1] or [players.min(), players.max()]
+
+    point_trace, density_trace = viewport_traces(x_range, y_range)
+    patched_fig = Patch()
+    patch_trace(patched_fig['data'][0], point_trace)
+    patch_trace(patched_fig['data'][1], density_trace)
+    return patched_fig
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -3,8 +3,14 @@ import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.colors import get_colorscale
 import pandas as pd
+import numpy as np
 import dash_ag_grid as dag
+from functools import lru_cache
+import hashlib
+import os
 
 # Load your data
 df = pd.read_csv('https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2025/week-3/ODL-Export-Countries.csv')
@@ -30,18 +36,65 @@ funding_ranges = [
     {'label': '$50M+', 'value': '50000000-1000000000'}
 ]
 
+# Parse the funding range values once: '0-1000000' -> (0, 1000000)
+funding_bounds = {
+    option['value']: tuple(map(int, option['value'].split('-')))
+    for option in funding_ranges if option['value'] != 'All'
+}
+
+# Bucket every row by the predefined funding edges; bucket labels match the dropdown values
+funding_edges = sorted({bound for bounds in funding_bounds.values() for bound in bounds})
+df['Funding Bucket'] = pd.cut(
+    df['FA Financing $'],
+    bins=funding_edges,
+    labels=[f"{low}-{high}" for low, high in zip(funding_edges[:-1], funding_edges[1:])],
+    right=False,
+)
+
+# (region, bucket) -> row positions, with 'All' covering every region and every bucket
+region_positions = {'All': np.arange(len(df))}
+region_positions.update(df.groupby('Region').indices)
+bucket_positions = {('All', 'All'): region_positions['All']}
+for region, positions in region_positions.items():
+    bucket_positions[(region, 'All')] = positions
+    for bucket, bucket_rows in df.iloc[positions].groupby('Funding Bucket', observed=True).indices.items():
+        bucket_positions[(region, bucket)] = positions[bucket_rows]
+
+# Per region, the row positions sorted by funding, for ranges that are not predefined buckets
+region_funding_order = {}
+for region, positions in region_positions.items():
+    funding = df['FA Financing $'].to_numpy()[positions]
+    valid = ~np.isnan(funding)
+    order = np.argsort(funding[valid], kind='mergesort')
+    region_funding_order[region] = (funding[valid][order], positions[valid][order])
+
+# Row positions of a region whose funding lies in [min_funding, max_funding)
+def funding_range_positions(region, min_funding, max_funding):
+    sorted_funding, positions = region_funding_order[region]
+    start, stop = np.searchsorted(sorted_funding, [min_funding, max_funding], side='left')
+    return np.sort(positions[start:stop])
+
 # Function to filter the dataframe by region and funding range
 def filter_data(region, funding_range):
-    filtered_df = df[df['Region'] == region] if region and region != 'All' else df
-    
-    if funding_range != 'All':
-        min_funding, max_funding = map(int, funding_range.split('-'))
-        filtered_df = filtered_df[(filtered_df['FA Financing $'] >= min_funding) & (filtered_df['FA Financing $'] < max_funding)]
-    
-    return filtered_df
+    region = region if region and region != 'All' else 'All'
 
-# Function to create the choropleth map
-def create_map(selected_region=None, selected_color_scale='deep', funding_range='All'):
+    positions = bucket_positions.get((region, funding_range))
+    if positions is None:
+        if region not in region_positions:
+            return df.iloc[[]]
+        if funding_range in funding_bounds:
+            # A predefined bucket with no rows in this region
+            positions = []
+        else:
+            min_funding, max_funding = map(int, funding_range.split('-'))
+            positions = funding_range_positions(region, min_funding, max_funding)
+
+    return df.iloc[positions]
+
+# Function to build the choropleth map for one (region, funding range) data slice;
+# the color scale is applied afterwards, so built figures are kept and reused
+@lru_cache(maxsize=32)
+def build_map(selected_region, funding_range):
     filtered_df = filter_data(selected_region, funding_range)
     
     fig = px.choropleth(
@@ -50,7 +103,6 @@ def create_map(selected_region=None, selected_color_scale='deep', funding_range=
         color='FA Financing $',
         hover_name='Country Name',
         title='',
-        color_continuous_scale=selected_color_scale,
         hover_data={
             'FA Financing $': ':,.2f',
             'Country Name': True,
@@ -82,12 +134,174 @@ def create_map(selected_region=None, selected_color_scale='deep', funding_range=
     )
     return fig
 
+# Function to create the choropleth map
+def create_map(selected_region=None, selected_color_scale='deep', funding_range='All'):
+    # Copy the cached figure so the color scale never leaks into the cache
+    fig = go.Figure(build_map(selected_region, funding_range))
+    fig.update_layout(coloraxis_colorscale=get_colorscale(selected_color_scale or 'deep'))
+    return fig
+
+# Parsed copies of Excel exports are cached here as Parquet
+CACHE_DIR = '.data_cache'
+
+# Load an Excel export, converting it to Parquet once and reading the cached copy afterwards
+def load_excel_cached(path):
+    # The cache key changes whenever a new export is dropped in under the same name
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(str(os.stat(path).st_mtime_ns).encode())
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(CACHE_DIR, f"{stem}-{digest.hexdigest()[:16]}.parquet")
+
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    data = pd.read_excel(path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Drop caches of older versions of this export, then write atomically
+        for name in os.listdir(CACHE_DIR):
+            if name.startswith(f"{stem}-") and name.endswith('.parquet'):
+                os.remove(os.path.join(CACHE_DIR, name))
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except (ImportError, OSError, ValueError, TypeError):
+        # No Parquet engine or a column it cannot store: keep working from the Excel data
+        pass
+    return data
+
 # Load the projects dataset
-projects_df = pd.read_excel('ODL-Export-projects-1737305653693.xlsx')
+projects_df = load_excel_cached('ODL-Export-projects-1737305653693.xlsx')
 
 # Create a mapping of ISO3 to country names
 iso3_to_country = dict(zip(df['ISO3'], df['Country Name']))
 
+# Reverse mapping, lower-cased so it matches the grid's case-insensitive text filter
+country_to_iso3 = {str(name).lower(): iso3 for iso3, name in iso3_to_country.items()}
+
+# Known names as tuples of their comma-separated parts, so names such as "Korea, Republic of"
+# can be matched inside comma-separated lists
+country_name_parts = {tuple(part.strip() for part in name.split(',')): iso3 for name, iso3 in country_to_iso3.items()}
+max_name_parts = max(map(len, country_name_parts), default=1)
+
+# Split a 'Countries' cell into ISO3 codes; multi-country projects list several names,
+# separated by ';' or ',', and each position takes the longest known name starting there
+def countries_to_iso3(countries):
+    if pd.isna(countries):
+        return []
+    codes = []
+    for part in str(countries).lower().split(';'):
+        names = [name.strip() for name in part.split(',')]
+        start = 0
+        while start < len(names):
+            for stop in range(min(len(names), start + max_name_parts), start, -1):
+                iso3 = country_name_parts.get(tuple(names[start:stop]))
+                if iso3 is not None:
+                    codes.append(iso3)
+                    start = stop
+                    break
+            else:
+                start += 1
+    return codes
+
+# Build the ISO3 -> project row positions index once at startup
+project_positions = {}
+for position, countries in enumerate(projects_df['Countries']):
+    for iso3 in dict.fromkeys(countries_to_iso3(countries)):
+        project_positions.setdefault(iso3, []).append(position)
+project_positions = {iso3: np.array(positions) for iso3, positions in project_positions.items()}
+
+# Projects of a single country, serialized once and kept for repeat clicks
+@lru_cache(maxsize=64)
+def country_project_records(iso3):
+    return projects_df.iloc[project_positions.get(iso3, [])].to_dict('records')
+
+# Rows per block requested by the grid, and how many blocks it may keep in memory
+GRID_BLOCK_SIZE = 100
+GRID_MAX_BLOCKS = 3
+
+# Use the number filter for numeric columns and the text filter for everything else
+projects_column_defs = [
+    {
+        'headerName': col,
+        'field': col,
+        'filter': 'agNumberColumnFilter' if pd.api.types.is_numeric_dtype(projects_df[col]) else 'agTextColumnFilter',
+    }
+    for col in projects_df.columns
+]
+
+# Build a boolean mask for a single condition of the grid's filterModel
+def condition_mask(column, condition):
+    filter_type = condition.get('filterType', 'text')
+    kind = condition.get('type', 'contains')
+
+    if kind == 'blank':
+        return column.isna() | (column.astype(str).str.strip() == '')
+    if kind == 'notBlank':
+        return ~(column.isna() | (column.astype(str).str.strip() == ''))
+
+    if filter_type == 'number':
+        value = condition.get('filter')
+        if kind == 'equals':
+            return column == value
+        if kind == 'notEqual':
+            return column != value
+        if kind == 'lessThan':
+            return column < value
+        if kind == 'lessThanOrEqual':
+            return column <= value
+        if kind == 'greaterThan':
+            return column > value
+        if kind == 'greaterThanOrEqual':
+            return column >= value
+        if kind == 'inRange':
+            return (column >= value) & (column <= condition.get('filterTo'))
+        return pd.Series(True, index=column.index)
+
+    # Text filters are case-insensitive, like the grid's own client-side filtering
+    text = column.fillna('').astype(str).str.lower()
+    value = str(condition.get('filter', '')).lower()
+    if kind == 'equals':
+        return text == value
+    if kind == 'notEqual':
+        return text != value
+    if kind == 'startsWith':
+        return text.str.startswith(value)
+    if kind == 'endsWith':
+        return text.str.endswith(value)
+    if kind == 'notContains':
+        return ~text.str.contains(value, regex=False)
+    return text.str.contains(value, regex=False)
+
+# Apply the grid's filterModel ({column: condition}) to a dataframe
+def apply_filter_model(data, filter_model):
+    for col, model in (filter_model or {}).items():
+        if col not in data.columns:
+            continue
+        # Combined filters come either as a list of conditions or as condition1/condition2
+        conditions = model.get('conditions') or [model[key] for key in ('condition1', 'condition2') if key in model]
+        if conditions:
+            masks = [condition_mask(data[col], condition) for condition in conditions]
+            mask = masks[0]
+            for other in masks[1:]:
+                mask = (mask | other) if model.get('operator') == 'OR' else (mask & other)
+        else:
+            mask = condition_mask(data[col], model)
+        data = data[mask]
+    return data
+
+# Apply the grid's sortModel ([{'colId': ..., 'sort': 'asc' | 'desc'}]) to a dataframe
+def apply_sort_model(data, sort_model):
+    sort_model = [sort for sort in (sort_model or []) if sort['colId'] in data.columns]
+    if not sort_model:
+        return data
+    return data.sort_values(
+        by=[sort['colId'] for sort in sort_model],
+        ascending=[sort['sort'] == 'asc' for sort in sort_model],
+        kind='mergesort',
+    )
+
 # Initialize the Dash app
 app = dash.Dash(__name__)
 
@@ -164,9 +378,17 @@ app.layout = html.Div(
                 html.H2("Funding Activities by Country"),
                 dag.AgGrid(
                     id='funding-activities-grid',
-                    columnDefs=[{'headerName': col, 'field': col} for col in projects_df.columns],
-                    rowData=projects_df.to_dict('records'),
-                    dashGridOptions={'pagination': True, 'paginationPageSize': 20},
+                    columnDefs=projects_column_defs,
+                    defaultColDef={'sortable': True, 'filter': True, 'floatingFilter': True},
+                    # Rows are served block by block from the server instead of shipping projects_df
+                    rowModelType='infinite',
+                    dashGridOptions={
+                        'pagination': True,
+                        'paginationPageSize': 20,
+                        'cacheBlockSize': GRID_BLOCK_SIZE,
+                        'maxBlocksInCache': GRID_MAX_BLOCKS,
+                        'rowBuffer': 0,
+                    },
                     style={'height': '400px', 'width': '100%'}
                 )
             ]
@@ -182,11 +404,52 @@ app.layout = html.Div(
      Input('funding-range-dropdown', 'value')]
 )
 def update_map(selected_region, selected_color_scale, funding_range):
+    # Only the color scale changed: patch it in place instead of resending the locations
+    # (a cleared dropdown falls back to the default scale)
+    if dash.ctx.triggered_id == 'color-scale-dropdown':
+        patched_fig = dash.Patch()
+        patched_fig['layout']['coloraxis']['colorscale'] = get_colorscale(selected_color_scale or 'deep')
+        return patched_fig
     return create_map(selected_region, selected_color_scale, funding_range)
 
-# Callback to update the AG Grid based on map click
+# Callback to serve the visible block of the AG Grid, sorted and filtered on the server
+@app.callback(
+    Output('funding-activities-grid', 'getRowsResponse'),
+    [Input('funding-activities-grid', 'getRowsRequest')]
+)
+def get_grid_rows(request):
+    if not request:
+        return dash.no_update
+
+    start_row = request.get('startRow', 0)
+    end_row = request.get('endRow', start_row + GRID_BLOCK_SIZE)
+    filter_model = dict(request.get('filterModel') or {})
+    sort_model = request.get('sortModel')
+
+    # A country filter set by a map click is resolved through the project index
+    filtered_df = projects_df
+    country_filter = filter_model.get('Countries', {})
+    iso3 = None
+    if country_filter.get('type') == 'equals':
+        iso3 = country_to_iso3.get(str(country_filter.get('filter', '')).lower())
+    if iso3:
+        del filter_model['Countries']
+        if not filter_model and not sort_model:
+            records = country_project_records(iso3)
+            return {'rowData': records[start_row:end_row], 'rowCount': len(records)}
+        filtered_df = projects_df.iloc[project_positions.get(iso3, [])]
+
+    filtered_df = apply_filter_model(filtered_df, filter_model)
+    filtered_df = apply_sort_model(filtered_df, sort_model)
+
+    return {
+        'rowData': filtered_df.iloc[start_row:end_row].to_dict('records'),
+        'rowCount': len(filtered_df),
+    }
+
+# Callback to filter the AG Grid based on map click
 @app.callback(
-    Output('funding-activities-grid', 'rowData'),
+    Output('funding-activities-grid', 'filterModel'),
     [Input('funding-map', 'clickData')]
 )
 def update_ag_grid(clickData):
@@ -195,12 +458,11 @@ def update_ag_grid(clickData):
         clicked_country_iso3 = clickData['points'][0]['location']
         # Map ISO3 to country name
         clicked_country_name = iso3_to_country.get(clicked_country_iso3)
-        
+
         if clicked_country_name:
-            # Filter projects_df using country name
-            filtered_df = projects_df[projects_df['Countries'] == clicked_country_name]
-            return filtered_df.to_dict('records')
-    return projects_df.to_dict('records')
+            # Setting the filterModel makes the grid request its rows again with this filter
+            return {'Countries': {'filterType': 'text', 'type': 'equals', 'filter': clicked_country_name}}
+    return {}
 
 # Run the app
 if __name__ == '__main__':
@@ -1,6 +1,8 @@
-from dash import Dash, dcc, html
+from dash import Dash, dcc, html, Patch, ctx
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 import dash.dependencies
 
 # Read data
@@ -10,95 +12,82 @@ df['age of writer'] = df.nea_grant_year - df.birth_year
 # Normalize gender labels
 df['gender'] = df['gender'].str.strip().str.title()
 
+# Encode a column as integer codes, with missing values in an extra last slot
+def encode_dimension(values):
+    codes, labels = pd.factorize(values, sort=True)
+    codes[codes < 0] = len(labels)
+    return codes, labels
+
+# Ages become a contiguous axis of one-year bins starting at the youngest age
+ages = np.floor(df['age of writer'])
+age_min = int(ages.min())
+age_codes = np.where(ages.notna(), ages.fillna(age_min) - age_min, ages.max() - age_min + 1).astype(int)
+age_labels = np.arange(age_min, int(ages.max()) + 1)
+
+gender_codes, gender_labels = encode_dimension(df['gender'])
+year_codes, year_labels = encode_dimension(df['nea_grant_year'])
+state_codes, state_labels = encode_dimension(df['us_state'])
+
+# Grant counts over (gender, grant year, state, age); the last slot of each axis holds missing values
+cube_shape = (len(gender_labels) + 1, len(year_labels) + 1, len(state_labels) + 1, len(age_labels) + 1)
+count_cube = np.bincount(
+    np.ravel_multi_index((gender_codes, year_codes, state_codes, age_codes), cube_shape),
+    minlength=int(np.prod(cube_shape))
+).reshape(cube_shape)
+
 # Define custom colors
 color_map = {
     'Female': 'pink', 
     'Male': 'blue',     
 }
 
-# Create Dash app
-app = Dash(__name__)
+# Cube slice for a gender filter: a list of genders, or None for everyone
+# (the last slot, rows with a missing gender, only passes when no gender is picked)
+def filtered_cube(genders):
+    if genders is None:
+        return count_cube
+    selected = np.r_[np.isin(gender_labels, genders), False]
+    return count_cube * selected[:, None, None, None]
 
-# Layout
-app.layout = html.Div([
-    html.H1("NEA Grant Data Dashboard 1996-2024 in US", style={"textAlign": "left", "marginLeft": "40px"}),  
+# Cumulative grant counts per gender over integer ages, with a leading zero column,
+# so the count of any age interval is a difference of two entries
+age_prefix = np.zeros((len(gender_labels), len(age_labels) + 1), dtype=np.int64)
+age_prefix[:, 1:] = np.cumsum(count_cube[:-1, :, :, :-1].sum(axis=(1, 2)), axis=1)
 
-    # Title for pie chart cross-filtering with larger font
-    html.Div([  
-        html.H5("Click on the Pie Chart to Filter Data:", style={"fontSize": "30px", "textAlign": "center", "marginBottom": "30px"}), 
-    ]), 
-
-    # Reset Filter Button
-    html.Div([  
-        html.Button("Reset Filters", id="reset-button", n_clicks=0, style={"fontSize": "20px", "textAlign": "center", "marginBottom": "20px", "padding": "10px 20px"}), 
-    ], style={"textAlign": "center"}), 
+# Age histogram with bins of bin_width years, aligned on multiples of the width
+def create_age_histogram(genders, bin_width):
+    first_edge = (age_min // bin_width) * bin_width
+    edges = np.arange(first_edge, age_labels[-1] + 1 + bin_width, bin_width)
+    positions = np.clip(edges - age_min, 0, len(age_labels))
+    bin_counts = age_prefix[:, positions[1:]] - age_prefix[:, positions[:-1]]
 
-    # Layout for Pie Chart, Histogram, Grant Bar Chart, and US State Treemap
-    html.Div([  
-        # Pie Chart (Gender Distribution)
-        html.Div([dcc.Graph(id='gender-pie-chart')], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}), 
-
-        # Histogram
-        html.Div([dcc.Graph(id='age-histogram')], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}),  
-    ], style={'display': 'flex', 'justifyContent': 'space-between'}), 
+    age_histogram_fig = go.Figure()
+    for row, gender in enumerate(gender_labels):
+        if genders is not None and gender not in genders:
+            continue
+        age_histogram_fig.add_trace(go.Bar(
+            x=edges[:-1] + bin_width / 2,
+            y=bin_counts[row],
+            width=bin_width,
+            name=gender,
+            marker_color=color_map.get(gender)
+        ))
 
-    # Layout for Grant Bar Chart and US State Treemap side by side
-    html.Div([
-        # Grant Bar Chart
-        html.Div([dcc.Graph(id='grant-bar-chart')], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}),
-
-        # US State Treemap
-        html.Div([dcc.Graph(id='us-state-treemap')], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'})
-    ], style={'display': 'flex', 'justifyContent': 'space-between'}), 
-])
-
-# Callback to update all charts
-@app.callback(
-    [dash.dependencies.Output('age-histogram', 'figure'),
-     dash.dependencies.Output('gender-pie-chart', 'figure'),
-     dash.dependencies.Output('grant-bar-chart', 'figure'),
-     dash.dependencies.Output('us-state-treemap', 'figure')],
-    [dash.dependencies.Input('gender-pie-chart', 'clickData'),
-     dash.dependencies.Input('grant-bar-chart', 'clickData'),
-     dash.dependencies.Input('reset-button', 'n_clicks')]
-)
-def update_charts(pieClickData, barClickData, resetButton):
-    # Initialize gender filter
-    selected_gender = None
-
-    # If the Reset Filters button was clicked, reset the filters
-    if resetButton > 0:
-        pieClickData = None
-        barClickData = None
-
-    # Determine gender filter from pie chart click
-    if pieClickData is not None:
-        selected_gender = pieClickData['points'][0]['label']
-
-    # Filter data by gender if selected (from pie chart or bar chart)
-    filtered_df = df
-    if selected_gender:
-        filtered_df = filtered_df[filtered_df['gender'] == selected_gender]
-
-    # Handle Bar Chart Click (cross-filtering)
-    if barClickData is not None:
-        clicked_gender = barClickData['points'][0]['label']
-        filtered_df = filtered_df[filtered_df['gender'] == clicked_gender]
-
-    # Create Histogram (Age Distribution)
-    age_histogram_fig = px.histogram(
-        filtered_df,
-        x='age of writer',
-        nbins=20,
+    age_histogram_fig.update_layout(
         title="Age Distribution of Writers",
-        labels={'age of writer': 'Age of Writer'},
-        color='gender',
-        color_discrete_map=color_map
+        xaxis_title="Age of Writer",
+        yaxis_title="count",
+        legend_title="gender",
+        barmode='stack',
+        bargap=0
     )
+    return age_histogram_fig
 
-    # Create Pie Chart (Gender Distribution)
-    gender_counts = filtered_df['gender'].value_counts().reset_index()
-    gender_counts.columns = ['gender', 'count']
+# Gender pie over all grants; the filtered genders are pulled out of the pie
+def create_gender_pie():
+    gender_totals = count_cube[:-1].sum(axis=(1, 2, 3))
+    gender_counts = pd.DataFrame({'gender': gender_labels, 'count': gender_totals})
+    gender_counts = gender_counts[gender_counts['count'] > 0].sort_values('count', ascending=False)
     
     gender_pie_chart_fig = px.pie(
         gender_counts,
@@ -108,9 +97,17 @@ def update_charts(pieClickData, barClickData, resetButton):
         color='gender',
         color_discrete_map=color_map
     )
+    return gender_pie_chart_fig
 
-    # Create Bar Chart (Gender by Year)
-    grant_counts = filtered_df.groupby(['nea_grant_year', 'gender']).size().reset_index(name='grant_count')
+# Grant counts by year, stacked by gender
+def create_grant_bar(cube):
+    year_gender = cube[:-1].sum(axis=(2, 3))[:, :-1]
+    grant_counts = pd.DataFrame({
+        'nea_grant_year': np.tile(year_labels, len(gender_labels)),
+        'gender': np.repeat(gender_labels, len(year_labels)),
+        'grant_count': year_gender.ravel()
+    })
+    grant_counts = grant_counts[grant_counts['grant_count'] > 0]
 
     grant_fig = px.bar(
         grant_counts,
@@ -123,10 +120,13 @@ def update_charts(pieClickData, barClickData, resetButton):
         category_orders={"gender": ["Female", "Male"]},
         barmode='stack'
     )
+    return grant_fig
 
-    # Create Treemap for US States
-    us_state_counts = filtered_df['us_state'].value_counts().reset_index()
-    us_state_counts.columns = ['us_state', 'count']
+# Treemap of grants per US state
+def create_state_treemap(cube):
+    state_totals = cube.sum(axis=(0, 1, 3))[:-1]
+    us_state_counts = pd.DataFrame({'us_state': state_labels, 'count': state_totals})
+    us_state_counts = us_state_counts[us_state_counts['count'] > 0].sort_values('count', ascending=False)
 
     treemap_fig = px.treemap(
         us_state_counts,
@@ -144,8 +144,129 @@ def update_charts(pieClickData, barClickData, resetButton):
         plot_bgcolor="white",
         margin=dict(l=40, r=40, t=40, b=40)
     )
+    return treemap_fig
 
-    return age_histogram_fig, gender_pie_chart_fig, grant_fig, treemap_fig
+# Pie slices in drawing order, and the pie itself, which never changes with the filter
+gender_pie_chart_fig = create_gender_pie()
+pie_genders = list(gender_pie_chart_fig.data[0].labels)
+
+# Patch replacing only the traces of a figure; the layout and template stay as first painted
+def data_patch(fig):
+    patched_fig = Patch()
+    patched_fig['data'] = fig.to_plotly_json()['data']
+    return patched_fig
+
+# Create Dash app
+app = Dash(__name__)
+
+# Layout
+app.layout = html.Div([
+    html.H1("NEA Grant Data Dashboard 1996-2024 in US", style={"textAlign": "left", "marginLeft": "40px"}),  
+
+    # Title for pie chart cross-filtering with larger font
+    html.Div([  
+        html.H5("Click on the Pie Chart to Filter Data:", style={"fontSize": "30px", "textAlign": "center", "marginBottom": "30px"}), 
+    ]), 
+
+    # Reset Filter Button
+    html.Div([  
+        html.Button("Reset Filters", id="reset-button", n_clicks=0, style={"fontSize": "20px", "textAlign": "center", "marginBottom": "20px", "padding": "10px 20px"}), 
+    ], style={"textAlign": "center"}), 
+
+    # Layout for Pie Chart, Histogram, Grant Bar Chart, and US State Treemap
+    html.Div([  
+        # Pie Chart (Gender Distribution)
+        html.Div([dcc.Graph(id='gender-pie-chart', figure=gender_pie_chart_fig)], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}), 
+
+        # Histogram with its bin width control
+        html.Div([
+            dcc.Graph(id='age-histogram', figure=create_age_histogram(None, 5)),
+            html.Label("Age bin width (years):"),
+            dcc.RadioItems(id='age-bin-width', options=[1, 2, 5, 10], value=5, inline=True),
+        ], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}),  
+    ], style={'display': 'flex', 'justifyContent': 'space-between'}), 
+
+    # Layout for Grant Bar Chart and US State Treemap side by side
+    html.Div([
+        # Grant Bar Chart
+        html.Div([dcc.Graph(id='grant-bar-chart', figure=create_grant_bar(count_cube))], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'}),
+
+        # US State Treemap
+        html.Div([dcc.Graph(id='us-state-treemap', figure=create_state_treemap(count_cube))], style={'width': '48%', 'display': 'inline-block', 'padding': '10px'})
+    ], style={'display': 'flex', 'justifyContent': 'space-between'}), 
+
+    # Effective gender filter shared by the charts
+    dcc.Store(id='gender-filter'),
+])
+
+# Callback to turn pie and bar clicks into the effective gender filter
+@app.callback(
+    [dash.dependencies.Output('gender-filter', 'data'),
+     dash.dependencies.Output('gender-pie-chart', 'clickData'),
+     dash.dependencies.Output('grant-bar-chart', 'clickData')],
+    [dash.dependencies.Input('gender-pie-chart', 'clickData'),
+     dash.dependencies.Input('grant-bar-chart', 'clickData'),
+     dash.dependencies.Input('reset-button', 'n_clicks')],
+    [dash.dependencies.State('gender-filter', 'data')]
+)
+def update_gender_filter(pieClickData, barClickData, resetButton, current_filter):
+    # If the Reset Filters button was clicked, reset the filters and the clicks behind them
+    if ctx.triggered_id == 'reset-button':
+        if current_filter is None:
+            return dash.no_update, None, None
+        return None, None, None
+
+    # Genders left by the pie chart and bar chart clicks (cross-filtering)
+    genders = None
+    for clickData in (pieClickData, barClickData):
+        if clickData is not None:
+            clicked_gender = clickData['points'][0]['label']
+            genders = [gender for gender in (genders if genders is not None else gender_labels) if gender == clicked_gender]
+
+    # Only a changed filter reaches the charts
+    if genders == current_filter:
+        return dash.no_update, dash.no_update, dash.no_update
+    return genders, dash.no_update, dash.no_update
+
+# Callback to update the histogram; the unfiltered figures are painted with the layout,
+# so the chart callbacks only send new traces
+@app.callback(
+    dash.dependencies.Output('age-histogram', 'figure'),
+    [dash.dependencies.Input('gender-filter', 'data'),
+     dash.dependencies.Input('age-bin-width', 'value')],
+    prevent_initial_call=True
+)
+def update_age_histogram(genders, bin_width):
+    return data_patch(create_age_histogram(genders, bin_width))
+
+# Callback to highlight the filtered genders in the pie chart; only the slice pull changes
+@app.callback(
+    dash.dependencies.Output('gender-pie-chart', 'figure'),
+    [dash.dependencies.Input('gender-filter', 'data')],
+    prevent_initial_call=True
+)
+def update_gender_pie(genders):
+    patched_fig = Patch()
+    patched_fig['data'][0]['pull'] = [0.1 if genders is not None and gender in genders else 0 for gender in pie_genders]
+    return patched_fig
+
+# Callback to update the grant bar chart
+@app.callback(
+    dash.dependencies.Output('grant-bar-chart', 'figure'),
+    [dash.dependencies.Input('gender-filter', 'data')],
+    prevent_initial_call=True
+)
+def update_grant_bar(genders):
+    return data_patch(create_grant_bar(filtered_cube(genders)))
+
+# Callback to update the US state treemap
+@app.callback(
+    dash.dependencies.Output('us-state-treemap', 'figure'),
+    [dash.dependencies.Input('gender-filter', 'data')],
+    prevent_initial_call=True
+)
+def update_state_treemap(genders):
+    return data_patch(create_state_treemap(filtered_cube(genders)))
 
 # Run app
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
@@ -9,15 +10,92 @@ import numpy as np
 df = pd.read_csv("https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-48/API_IT.NET.USER.ZS_DS2_en_csv_v2_2160.csv")
 df_filtered = df[df["Country Name"].isin(["Angola", "Albania", "Andorra", "Argentina"])]  # Filter for specific countries
 
-melted_data = pd.melt(
-    df_filtered,
-    id_vars=['Country Name'],
-    var_name='Year',
-    value_name='Quantity'
+# Keep the data as a dense (country, year) float32 array with a sorted year axis
+year_columns = sorted(
+    (col for col in df_filtered.columns if pd.notna(pd.to_numeric(col, errors='coerce'))),
+    key=float
 )
+countries = df_filtered['Country Name'].to_numpy()
+years = np.array([int(float(col)) for col in year_columns])
+quantities = df_filtered[year_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+
+# Drop the years without any data so the slider covers only years with values
+has_data = ~np.isnan(quantities).all(axis=0)
+years = years[has_data]
+quantities = quantities[:, has_data]
+
+# Layout shared by the server-rendered figure and the clientside callback
+chart_layout = go.Layout(
+    hovermode='x unified',
+    template='plotly_dark',
+    plot_bgcolor='#1e1e1e',
+    paper_bgcolor='#1e1e1e',
+    xaxis_title='Year',
+    yaxis_title='Quantity',
+    margin=dict(l=50, r=50, t=100, b=50),  # Adjust margin to accommodate the top legend
+    legend=dict(
+        visible=False  # Remove legend
+    )
+)
+
+# Build the line chart for a year range (server-rendered first paint)
+def create_chart(selected_year_range):
+    # Map the selected year range to a slice of the year axis (a view, no copy)
+    start = np.searchsorted(years, selected_year_range[0], side='left')
+    stop = np.searchsorted(years, selected_year_range[1], side='right')
+    window_years = years[start:stop]
+    window = quantities[:, start:stop]
+
+    # Only countries with at least one value in the range get a line
+    plotted = np.flatnonzero(~np.isnan(window).all(axis=1))
+    colors = px.colors.qualitative.Plotly
+
+    # Create the line chart with increased line thickness and smooth lines
+    fig = go.Figure(data=[
+        go.Scatter(
+            x=window_years,
+            y=window[row],
+            name=countries[row],
+            mode='lines+markers',
+            line=dict(color=colors[color_index % len(colors)], width=5, shape='spline'),
+            connectgaps=True,
+        )
+        for color_index, row in enumerate(plotted)
+    ])
 
-melted_data['Year'] = pd.to_numeric(melted_data['Year'], errors='coerce')
-melted_data = melted_data.dropna(subset=['Year', 'Quantity'])
+    # Find the last valid point of every plotted country in one pass
+    valid = ~np.isnan(window[plotted])
+    last = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    last_values = window[plotted, last]
+
+    # Add annotations for the country name and percentage at the last point (without data label)
+    fig.update_layout(annotations=[
+        dict(
+            x=window_years[year_index],
+            y=value,
+            text=f"{countries[row]}: {value:.0f}%",
+            showarrow=True,
+            arrowhead=0,
+            ax=5,
+            ay=-20,
+            font=dict(size=14, color=colors[color_index % len(colors)]),
+        )
+        for color_index, (row, year_index, value) in enumerate(zip(plotted, last, last_values))
+    ])
+
+    # Apply the shared layout for the title and legend removal
+    fig.update_layout(chart_layout)
+
+    return fig
+
+# Compact columnar copy of the series, sent to the browser once for clientside filtering
+series_data = {
+    'years': years.tolist(),
+    'countries': countries.tolist(),
+    'quantities': [[None if np.isnan(value) else round(float(value), 3) for value in row] for row in quantities],
+    'colors': px.colors.qualitative.Plotly,
+    'layout': chart_layout.to_plotly_json(),
+}
 
 # Dash app setup
 app = dash.Dash(__name__)
@@ -47,11 +125,11 @@ app.layout = html.Div(
                         html.Label("Select Year Range:", style={'color': '#ffffff', 'font-size': '18px'}),
                         dcc.RangeSlider(
                             id='year-slider',
-                            min=melted_data['Year'].min(),
-                            max=melted_data['Year'].max(),
+                            min=int(years[0]),
+                            max=int(years[-1]),
                             step=1,
-                            marks={int(year): str(int(year)) for year in range(int(melted_data['Year'].min()), int(melted_data['Year'].max()) + 1, 5)},
-                            value=[melted_data['Year'].min(), melted_data['Year'].max()]
+                            marks={int(year): str(int(year)) for year in range(int(years[0]), int(years[-1]) + 1, 5)},
+                            value=[int(years[0]), int(years[-1])]
                         )
                     ]
                 )
@@ -59,66 +137,59 @@ app.layout = html.Div(
         ),
 
         # Line chart with space between label and chart
-        dcc.Graph(id='line-chart', style={'width': '100%', 'height': '75vh', 'margin-top': '10px'})
+        dcc.Graph(
+            id='line-chart',
+            figure=create_chart([years[0], years[-1]]),
+            style={'width': '100%', 'height': '75vh', 'margin-top': '10px'}
+        ),
+        dcc.Store(id='series-data', data=series_data)
     ]
 )
 
-@app.callback(
+# Filter the year range and slice the traces in the browser, with no server round trip
+app.clientside_callback(
+    """
+    function(selectedYearRange, series) {
+        const years = series.years;
+        const lowerBound = (value, inclusive) => {
+            let lo = 0, hi = years.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (years[mid] < value || (inclusive && years[mid] === value)) { lo = mid + 1; } else { hi = mid; }
+            }
+            return lo;
+        };
+        const start = lowerBound(selectedYearRange[0], false);
+        const stop = lowerBound(selectedYearRange[1], true);
+        const x = years.slice(start, stop);
+
+        const data = [];
+        const annotations = [];
+        series.countries.forEach((country, row) => {
+            const y = series.quantities[row].slice(start, stop);
+            let last = y.length - 1;
+            while (last >= 0 && y[last] === null) { last--; }
+            if (last < 0) { return; }
+
+            const color = series.colors[data.length % series.colors.length];
+            data.push({
+                type: 'scatter', x: x, y: y, name: country, mode: 'lines+markers',
+                line: {color: color, width: 5, shape: 'spline'}, connectgaps: true
+            });
+            annotations.push({
+                x: x[last], y: y[last], text: country + ': ' + y[last].toFixed(0) + '%',
+                showarrow: true, arrowhead: 0, ax: 5, ay: -20, font: {size: 14, color: color}
+            });
+        });
+
+        return {data: data, layout: Object.assign({}, series.layout, {annotations: annotations})};
+    }
+    """,
     Output('line-chart', 'figure'),
-    [Input('year-slider', 'value')]
+    Input('year-slider', 'value'),
+    State('series-data', 'data'),
+    prevent_initial_call=True
 )
-def update_chart_and_summary(selected_year_range):
-    # Filter data for the selected year range
-    filtered_data = melted_data[
-        (melted_data['Year'] >= selected_year_range[0]) & 
-        (melted_data['Year'] <= selected_year_range[1])
-    ]
-
-    # Create the line chart with increased line thickness and smooth lines
-    fig = px.line(
-        filtered_data,
-        x="Year",
-        y="Quantity",
-        color="Country Name",
-        markers=True,
-        line_shape="spline",  # Smooth lines
-    )
-
-    # Apply color for the lines
-    fig.update_traces(
-        line=dict(width=5), 
-    )
-
-    # Add annotations for the country name and percentage at the last point (without data label)
-    for country in filtered_data['Country Name'].unique():
-        country_data = filtered_data[filtered_data['Country Name'] == country]
-        last_point = country_data[country_data['Year'] == country_data['Year'].max()].iloc[0]
-
-        # Add annotation for the country name and percentage at the last point
-        fig.add_annotation(
-            x=last_point['Year'],
-            y=last_point['Quantity'],
-            text=f"{country}: {last_point['Quantity']:.0f}%",
-            showarrow=True,
-            arrowhead=0,
-            ax=5,
-            ay=-20,
-            font=dict(size=14, color=px.colors.qualitative.Plotly[filtered_data['Country Name'].unique().tolist().index(country)]),
-        )
-
-    # Update layout for the title and legend removal
-    fig.update_layout(
-        hovermode='x unified',
-        template='plotly_dark',
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        margin=dict(l=50, r=50, t=100, b=50),  # Adjust margin to accommodate the top legend
-        legend=dict(
-            visible=False  # Remove legend
-        )
-    )
-
-    return fig
 
 
 if __name__ == '__main__':
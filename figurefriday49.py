@@ -1,12 +1,14 @@
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, ctx
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from datetime import date
-
-# Load and process the data
-data = pd.read_csv("https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-49/megawatt_demand_2024.csv")
-data['Local Timestamp'] = pd.to_datetime(data['Local Timestamp Eastern Time (Interval Beginning)'])
+from functools import lru_cache
+import io
+import os
+import threading
+import time
 
 regions = [
     "Connecticut Actual Load (MW)", "Maine Actual Load (MW)",
@@ -15,6 +17,288 @@ regions = [
     "Vermont Actual Load (MW)", "Western/Central Massachusetts Actual Load (MW)"
 ]
 
+# Keep only what the app reads: a datetime64[ns] index (int64 epoch nanoseconds
+# underneath) in place of the raw timestamp strings, and float32 region loads
+def compact_demand_frame(raw):
+    bytes_before = raw.memory_usage(deep=True).sum()
+    timestamps = pd.to_datetime(raw['Local Timestamp Eastern Time (Interval Beginning)'])
+    compact = pd.DataFrame(
+        raw[regions].to_numpy(dtype=np.float32),
+        columns=regions,
+        index=pd.DatetimeIndex(np.asarray(timestamps, dtype='datetime64[ns]'), name='Local Timestamp')
+    )
+    return compact, bytes_before, compact.memory_usage(deep=True).sum()
+
+# Load and process the data
+data, bytes_before, bytes_after = compact_demand_frame(pd.read_csv("https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-49/megawatt_demand_2024.csv"))
+print(f"Demand data: {bytes_before / 1e6:.1f} MB -> {bytes_after / 1e6:.1f} MB")
+
+# Sort into a DatetimeIndex so every day is one contiguous block of rows
+data = data.sort_index(kind='mergesort')
+
+# Day -> (start, stop) row offsets, so a day lookup is a plain positional slice
+days = data.index.normalize()
+day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+day_stops = np.r_[day_starts[1:], len(data)]
+day_offsets = {
+    day.date(): (start, stop)
+    for day, start, stop in zip(days[day_starts], day_starts, day_stops)
+}
+
+# Rows of a single day, sliced without scanning or copying the table
+def day_slice(day):
+    start, stop = day_offsets.get(day, (0, 0))
+    return data.iloc[start:stop]
+
+# Serialized stacked-area trace of one region on one day, reused across checkbox combinations
+@lru_cache(maxsize=256)
+def day_region_trace(day, region):
+    rows = day_slice(day)
+    return {
+        'type': 'scatter',
+        'x': rows.index.strftime('%Y-%m-%dT%H:%M:%S').tolist(),
+        'y': rows[region].to_numpy(dtype=np.float64).round(3).tolist(),
+        'mode': 'lines',
+        'stackgroup': 'one',
+        'name': region.split(' ')[0],
+        'line': {'shape': 'spline', 'width': 5},
+    }
+
+# Maximum number of points sent per series in range mode
+POINT_BUDGET = 2000
+
+# Rows whose timestamp lies in [start, end)
+def range_bounds(start, end):
+    return tuple(data.index.searchsorted([pd.Timestamp(start), pd.Timestamp(end)], side='left'))
+
+# Keep the rows where the stacked total is lowest and highest in each bucket, so
+# every series shares the same timestamps and peaks and troughs survive
+def downsample_rows(total, start, stop, budget=POINT_BUDGET):
+    n_buckets = budget // 2
+    n_rows = stop - start
+    if n_rows <= budget:
+        return np.arange(start, stop)
+
+    bucket_size = -(-n_rows // n_buckets)
+    buckets = np.full(n_buckets * bucket_size, np.nan)
+    buckets[:n_rows] = total[start:stop]
+    buckets = buckets.reshape(n_buckets, bucket_size)
+
+    # Padding can leave trailing buckets empty; skip those
+    filled = ~np.isnan(buckets).all(axis=1)
+    offsets = np.arange(n_buckets)[filled] * bucket_size
+    lows = offsets + np.nanargmin(buckets[filled], axis=1)
+    highs = offsets + np.nanargmax(buckets[filled], axis=1)
+    rows = np.unique(np.concatenate([lows, highs]))
+    return start + rows
+
+# Stacked total of all regions, used to pick the rows kept by downsampling
+total_load = data[regions].sum(axis=1).to_numpy()
+
+# Rollup grains offered in range mode; 'hour' keeps the raw intervals
+ROLLUP_GRAINS = ['hour', 'day', 'week', 'month']
+GRAIN_ADJECTIVES = {'hour': 'hourly', 'day': 'daily', 'week': 'weekly', 'month': 'monthly'}
+HOUR_NS = 3_600_000_000_000
+DAY_NS = 24 * HOUR_NS
+
+# Epoch nanoseconds of datetimes, whatever resolution pandas parsed them at
+def epoch_ns(datetimes):
+    return np.asarray(datetimes, dtype='datetime64[ns]').view(np.int64)
+
+# Bucket key and bucket start (epoch ns) of every row for a grain
+def grain_buckets(grain, timestamps):
+    if grain == 'hour':
+        keys = timestamps // HOUR_NS
+        return keys, keys * HOUR_NS
+    days_since_epoch = timestamps // DAY_NS
+    if grain == 'day':
+        return days_since_epoch, days_since_epoch * DAY_NS
+    if grain == 'week':
+        # 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday
+        keys = (days_since_epoch + 3) // 7
+        return keys, (keys * 7 - 3) * DAY_NS
+    months = pd.DatetimeIndex(timestamps)
+    keys = months.year.to_numpy() * 12 + months.month.to_numpy() - 1
+    return keys, epoch_ns(months.to_period('M').start_time)
+
+# Per-region sum, mean, min, max and peak time for every bucket of a grain, from the sorted rows
+def build_rollup(grain, timestamps, loads):
+    keys, bucket_starts = grain_buckets(grain, timestamps)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+
+    valid = ~np.isnan(loads)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    sums = np.add.reduceat(np.where(valid, loads, 0.0), starts, axis=0)
+    maxs = np.fmax.reduceat(loads, starts, axis=0)
+
+    # First row of each bucket that reaches the bucket maximum
+    rows = np.arange(len(keys))[:, None]
+    at_peak = np.where(loads == np.repeat(maxs, sizes, axis=0), rows, len(keys))
+    peak_rows = np.minimum(np.minimum.reduceat(at_peak, starts, axis=0), len(keys) - 1)
+
+    return {
+        'start': bucket_starts[starts],
+        'count': counts,
+        'sum': sums.astype(np.float32),
+        'mean': np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0).astype(np.float32),
+        'min': np.fmin.reduceat(loads, starts, axis=0).astype(np.float32),
+        'max': maxs.astype(np.float32),
+        'peak': np.where(counts > 0, timestamps[peak_rows], np.iinfo(np.int64).min),
+    }
+
+rollups = {
+    grain: build_rollup(grain, epoch_ns(data.index), data[regions].to_numpy(dtype=np.float64))
+    for grain in ROLLUP_GRAINS
+}
+
+# Bucket starts and one statistic (bucket, region) for the buckets overlapping [start, end)
+def rollup_query(grain, stat, start=None, end=None):
+    cube = rollups[grain]
+    lo = 0 if start is None else max(np.searchsorted(cube['start'], pd.Timestamp(start).value, side='right') - 1, 0)
+    hi = len(cube['start']) if end is None else np.searchsorted(cube['start'], pd.Timestamp(end).value, side='left')
+    return cube['start'][lo:hi], cube[stat][lo:hi]
+
+# One statistic (region) over the whole days in [start_ns, end_ns), combined from the day rollup
+def combine_days(stat, start_ns, end_ns):
+    days = rollups['day']
+    lo = np.searchsorted(days['start'], start_ns, side='left')
+    hi = np.searchsorted(days['start'], end_ns, side='left')
+    if stat in ('sum', 'count'):
+        return days[stat][lo:hi].sum(axis=0)
+    if stat == 'mean':
+        counts = days['count'][lo:hi].sum(axis=0)
+        sums = days['sum'][lo:hi].astype(np.float64).sum(axis=0)
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    if stat == 'min':
+        return np.fmin.reduce(days['min'][lo:hi], axis=0, initial=np.nan)
+    maxs = days['max'][lo:hi]
+    if stat == 'max':
+        return np.fmax.reduce(maxs, axis=0, initial=np.nan)
+    # Peak: the peak time of the day holding the largest maximum
+    peaks = np.full(len(regions), np.iinfo(np.int64).min)
+    for column in range(len(regions)):
+        if len(maxs) and not np.isnan(maxs[:, column]).all():
+            peaks[column] = days['peak'][lo + np.nanargmax(maxs[:, column]), column]
+    return peaks
+
+# Like rollup_query, but buckets reaching outside the whole days of [start, end) keep only their days
+# inside the range: their statistic is recombined from the day rollup and their start moves to the range start
+def clipped_rollup_query(grain, stat, start, end):
+    bucket_starts, values = rollup_query(grain, stat, start, end)
+    if grain in ('hour', 'day') or len(bucket_starts) == 0:
+        return bucket_starts, values
+
+    bucket_starts, values = bucket_starts.copy(), values.copy()
+    start_ns, end_ns = pd.Timestamp(start).value, pd.Timestamp(end).value
+    all_starts = rollups[grain]['start']
+    for position in {0, len(bucket_starts) - 1}:
+        bucket = np.searchsorted(all_starts, bucket_starts[position])
+        bucket_end = all_starts[bucket + 1] if bucket + 1 < len(all_starts) else np.iinfo(np.int64).max
+        if bucket_starts[position] >= start_ns and bucket_end <= end_ns:
+            continue
+        clipped_start, clipped_end = max(bucket_starts[position], start_ns), min(bucket_end, end_ns)
+        values[position] = combine_days(stat, clipped_start, clipped_end)
+        bucket_starts[position] = clipped_start
+    return bucket_starts, values
+
+# "Region: peak MW at time" for the selected regions over the whole days of [start, end)
+def peak_summary(grain, start, end, selected_regions):
+    _, maxs = clipped_rollup_query(grain, 'max', start, end)
+    _, peaks = clipped_rollup_query(grain, 'peak', start, end)
+    if len(maxs) == 0 or not selected_regions:
+        return ""
+    parts = []
+    for region in selected_regions:
+        column = regions.index(region)
+        if np.isnan(maxs[:, column]).all():
+            continue
+        bucket = np.nanargmax(maxs[:, column])
+        parts.append(
+            f"{region.split(' ')[0]} {maxs[bucket, column]:,.0f} MW at "
+            f"{pd.Timestamp(peaks[bucket, column]).strftime('%Y-%m-%d %H:%M')}"
+        )
+    return "Peak demand: " + " | ".join(parts) if parts else ""
+
+# Live mode: one replayed interval per tick, and at most a week of hourly points on screen
+LIVE_INTERVAL_MS = 1000
+LIVE_ROWS_PER_TICK = 1
+LIVE_MAX_POINTS = 24 * 7
+
+# Live rows are replayed from this CSV as another process appends to it; without it
+# the loaded year is replayed from the start of the file, LIVE_ROWS_PER_TICK rows per tick,
+# looping with timestamps shifted by whole periods so the feed never runs dry
+REPLAY_FILE = os.environ.get('DEMAND_REPLAY_FILE')
+
+replay_started = time.monotonic()
+replay_period = (data.index[-1] - data.index[0]) + (data.index[1] - data.index[0])
+replay_lock = threading.Lock()
+replay_offset = 0
+replay_header = None
+
+# Only the last LIVE_MAX_POINTS rows of the replay file are kept; replay_base is the
+# position of the first kept row, so cursors stay positions in the whole file
+replay_base = 0
+replay_timestamps = []
+replay_loads = {region: [] for region in regions}
+
+# Read the lines appended to the replay file since the last poll
+def poll_replay_file():
+    global replay_offset, replay_header, replay_base
+    with replay_lock:
+        with open(REPLAY_FILE, 'rb') as f:
+            f.seek(replay_offset)
+            chunk = f.read()
+        # Leave a partly written last line for the next poll
+        chunk = chunk[:chunk.rfind(b'\n') + 1]
+        if not chunk:
+            return
+        replay_offset += len(chunk)
+
+        lines = chunk.decode()
+        if replay_header is None:
+            header, _, lines = lines.partition('\n')
+            replay_header = pd.read_csv(io.StringIO(header)).columns.tolist()
+        if not lines:
+            return
+        new_rows = pd.read_csv(io.StringIO(lines), names=replay_header)
+        replay_timestamps.extend(pd.to_datetime(new_rows['Local Timestamp Eastern Time (Interval Beginning)']))
+        for region in regions:
+            replay_loads[region].extend(new_rows[region].tolist())
+
+        # Drop the rows no viewer can ask for any more
+        dropped = max(len(replay_timestamps) - LIVE_MAX_POINTS, 0)
+        if dropped:
+            replay_base += dropped
+            del replay_timestamps[:dropped]
+            for region in regions:
+                del replay_loads[region][:dropped]
+
+# New live rows after the cursor: (timestamps, {region: loads}, new cursor)
+def replay_rows(cursor, selected_regions):
+    if REPLAY_FILE:
+        poll_replay_file()
+        available = replay_base + len(replay_timestamps)
+    else:
+        ticks = int((time.monotonic() - replay_started) * 1000 / LIVE_INTERVAL_MS)
+        available = (ticks + 1) * LIVE_ROWS_PER_TICK
+
+    # A new viewer starts with the last window instead of everything replayed so far
+    start = max(cursor or 0, available - LIVE_MAX_POINTS)
+    if REPLAY_FILE:
+        with replay_lock:
+            first = max(start - replay_base, 0)
+            last = available - replay_base
+            timestamps = replay_timestamps[first:last]
+            loads = {region: replay_loads[region][first:last] for region in selected_regions}
+    else:
+        # Positions past the end of the data wrap around, one replay period later per lap
+        positions = np.arange(start, available)
+        rows = positions % len(data)
+        timestamps = data.index[rows] + replay_period * (positions // len(data))
+        loads = {region: data[region].to_numpy(dtype=np.float64)[rows].round(3) for region in selected_regions}
+    return timestamps, loads, available
+
 # Initialize the Dash app
 app = dash.Dash()
 
@@ -47,18 +331,37 @@ app.layout = html.Div(
                             'textAlign': 'left',
                             'flex': '0 0 auto'
                         }),
+                html.Div(id='peak-summary', style={'fontSize': '16px'}),
             ]
         ),
         
-        # Date picker single with dark background
+        # View mode, date picker single and date range picker with dark background
         html.Div(
-            style={'flex': 'flex-start', 'marginBottom': '10px'},
+            style={'flex': 'flex-start', 'marginBottom': '10px', 'display': 'flex', 'alignItems': 'center'},
             children=[
+                dcc.RadioItems(
+                    id='view-mode',
+                    options=[
+                        {'label': 'Single day', 'value': 'day'},
+                        {'label': 'Date range', 'value': 'range'},
+                        {'label': 'Live', 'value': 'live'}
+                    ],
+                    value='day',
+                    inputStyle={'marginRight': '5px'},
+                    labelStyle={'margin': '5px', 'color': 'white', 'fontSize': '16px'}
+                ),
+                dcc.RadioItems(
+                    id='grain',
+                    options=[{'label': grain.title(), 'value': grain} for grain in ROLLUP_GRAINS],
+                    value='hour',
+                    inputStyle={'marginRight': '5px'},
+                    labelStyle={'margin': '5px', 'color': 'white', 'fontSize': '16px'}
+                ),
                 dcc.DatePickerSingle(
                     id='date-picker',
                     date=date(2024, 10, 1),  # Default date
-                    min_date_allowed=data['Local Timestamp'].min().date(),
-                    max_date_allowed=data['Local Timestamp'].max().date(),
+                    min_date_allowed=data.index[0].date(),
+                    max_date_allowed=data.index[-1].date(),
                     display_format='YYYY-MM-DD',
                     style={
                         'color': 'black',
@@ -66,6 +369,19 @@ app.layout = html.Div(
                         'width': '500px'
                     },
                     calendar_orientation='horizontal'
+                ),
+                dcc.DatePickerRange(
+                    id='date-range-picker',
+                    start_date=data.index[0].date(),
+                    end_date=data.index[-1].date(),
+                    min_date_allowed=data.index[0].date(),
+                    max_date_allowed=data.index[-1].date(),
+                    display_format='YYYY-MM-DD',
+                    style={
+                        'color': 'black',
+                        'padding': '5px'
+                    },
+                    calendar_orientation='horizontal'
                 )
             ]
         ),
@@ -103,7 +419,12 @@ app.layout = html.Div(
                 'marginTop': '10px'
             },
             children=[
-                dcc.Graph(id='demand-graph', style={'height': '70vh', 'width': '100%'})
+                dcc.Graph(id='demand-graph', style={'height': '70vh', 'width': '100%'}),
+                # Live mode ticks and the last replayed row each viewer has received
+                dcc.Interval(id='live-interval', interval=LIVE_INTERVAL_MS, disabled=True),
+                dcc.Store(id='live-cursor'),
+                # Regions in the order of the day-mode figure's traces
+                dcc.Store(id='plotted-regions')
             ]
         )
     ]
@@ -112,31 +433,92 @@ app.layout = html.Div(
 # Callback to update the graph and the dynamic title
 @app.callback(
     [Output('demand-graph', 'figure'),
-     Output('graph-title', 'children')],
+     Output('graph-title', 'children'),
+     Output('peak-summary', 'children'),
+     Output('live-interval', 'disabled'),
+     Output('live-cursor', 'data'),
+     Output('plotted-regions', 'data')],
     [Input('region-checkbox', 'value'),
-     Input('date-picker', 'date')]
+     Input('view-mode', 'value'),
+     Input('grain', 'value'),
+     Input('date-picker', 'date'),
+     Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date'),
+     Input('demand-graph', 'relayoutData')],
+    [dash.State('plotted-regions', 'data')]
 )
-def update_graph_and_title(selected_regions, selected_date):
-    # Filter data for the selected date
-    filtered_data = data[data['Local Timestamp'].dt.date == pd.to_datetime(selected_date).date()]
+def update_graph_and_title(selected_regions, view_mode, grain, selected_date, start_date, end_date, relayout_data,
+                           plotted_regions):
+    # Zooming only re-queries the data in range mode
+    if ctx.triggered_id == 'demand-graph' and (view_mode != 'range' or not relayout_data or not (
+            'xaxis.range[0]' in relayout_data or 'xaxis.autorange' in relayout_data)):
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
-    fig = go.Figure()
+    if view_mode == 'live':
+        # Start with empty traces; the live interval extends them with new rows
+        filtered_data = data.iloc[0:0]
+        period = "(live)"
+        summary = ""
+    elif view_mode == 'range' and grain != 'hour':
+        # Coarser grains come straight from the precomputed rollups; partial edge buckets
+        # only average their days inside the range and are plotted from the range start
+        range_end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        bucket_starts, means = clipped_rollup_query(grain, 'mean', start_date, range_end)
+        filtered_data = pd.DataFrame(means, index=pd.to_datetime(bucket_starts), columns=regions)
+        period = f"({GRAIN_ADJECTIVES[grain]} mean, edge {grain}s clipped to the range) from {start_date} to {end_date}"
+        summary = peak_summary(grain, start_date, range_end, selected_regions)
+    elif view_mode == 'range':
+        # Whole days from the start date through the end date
+        start, stop = range_bounds(start_date, pd.Timestamp(end_date) + pd.Timedelta(days=1))
+        # A zoom narrows the rows, so the same point budget covers a finer resolution
+        if ctx.triggered_id == 'demand-graph' and 'xaxis.range[0]' in relayout_data:
+            zoom_start, zoom_stop = range_bounds(relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]'])
+            start, stop = max(start, zoom_start - 1), min(stop, zoom_stop + 1)
+        rows = downsample_rows(total_load, start, stop)
+        filtered_data = data.iloc[rows]
+        period = f"from {start_date} to {end_date}"
+        summary = peak_summary('day', start_date, pd.Timestamp(end_date) + pd.Timedelta(days=1), selected_regions)
+    else:
+        # Traces for the selected date come from the per-day per-region cache
+        day = pd.Timestamp(selected_date).date()
+        period = f"on {selected_date}"
+        day_start = pd.Timestamp(selected_date).normalize()
+        summary = peak_summary('day', day_start, day_start + pd.Timedelta(days=1), selected_regions)
 
+    # Create a dynamic title based on selected regions
     if selected_regions:
+        title = f"{'Hourly ' if view_mode == 'day' else ''}Demand for: {', '.join([region.split(' ')[0] for region in selected_regions])} {period}"
+    else:
+        title = "Select at least one region to display data"
+
+    # Toggling a single region on a day only appends or deletes that region's trace
+    if view_mode == 'day' and ctx.triggered_id == 'region-checkbox' and plotted_regions and selected_regions:
+        added = [region for region in selected_regions if region not in plotted_regions]
+        removed = [region for region in plotted_regions if region not in selected_regions]
+        if len(added) + len(removed) == 1:
+            patched_fig = dash.Patch()
+            if added:
+                patched_fig['data'].append(day_region_trace(day, added[0]))
+                plotted_regions = plotted_regions + added
+            else:
+                del patched_fig['data'][plotted_regions.index(removed[0])]
+                plotted_regions = [region for region in plotted_regions if region != removed[0]]
+            return patched_fig, title, summary, True, None, plotted_regions
+
+    fig = go.Figure()
+
+    if selected_regions and view_mode != 'day':
         for region in selected_regions:
             fig.add_trace(go.Scatter(
-                x=filtered_data['Local Timestamp'],
+                x=filtered_data.index,
                 y=filtered_data[region],
                 mode='lines',
                 stackgroup='one',
                 name=region.split(' ')[0],
-                line_shape='spline',
-                line_width=5
+                line_shape='linear',
+                line_width=2
             ))
-        # Create a dynamic title based on selected regions
-        title = f"Hourly Demand for: {', '.join([region.split(' ')[0] for region in selected_regions])} on {selected_date}"
-    else:
-        title = "Select at least one region to display data"
+    elif not selected_regions:
         fig.add_annotation(
             text=title,
             xref="paper", yref="paper",
@@ -158,10 +540,42 @@ def update_graph_and_title(selected_regions, selected_date):
         paper_bgcolor="#111111",
         plot_bgcolor="#111111",
         xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False)
+        yaxis=dict(showgrid=False),
+        # Keep the user's zoom while the re-queried data comes in
+        uirevision=f"{view_mode}-{grain}-{selected_date}-{start_date}-{end_date}"
     )
 
-    return fig, title
+    # Assemble the day-mode figure from the cached traces
+    if view_mode == 'day' and selected_regions:
+        fig = fig.to_plotly_json()
+        fig['data'] = [day_region_trace(day, region) for region in selected_regions]
+
+    # Switching to live mode restarts the feed from the latest window
+    return fig, title, summary, view_mode != 'live', None, (selected_regions if view_mode == 'day' else None)
+
+# Callback to append only the newly replayed rows to the live chart
+@app.callback(
+    [Output('demand-graph', 'extendData'),
+     Output('live-cursor', 'data', allow_duplicate=True)],
+    [Input('live-interval', 'n_intervals')],
+    [dash.State('region-checkbox', 'value'),
+     dash.State('live-cursor', 'data')],
+    prevent_initial_call=True
+)
+def extend_live_graph(n_intervals, selected_regions, cursor):
+    if not selected_regions:
+        return dash.no_update, dash.no_update
+
+    timestamps, loads, cursor = replay_rows(cursor, selected_regions)
+    if len(timestamps) == 0:
+        return dash.no_update, cursor
+
+    x = list(timestamps)
+    update = dict(
+        x=[x for _ in selected_regions],
+        y=[list(loads[region]) for region in selected_regions]
+    )
+    return (update, list(range(len(selected_regions))), LIVE_MAX_POINTS), cursor
 
 if __name__ == '__main__':
     app.run_server(debug=True)
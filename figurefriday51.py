@@ -3,7 +3,11 @@ import dash_bootstrap_components as dbc
 from dash_bootstrap_templates import load_figure_template
 import plotly.express as px
 import pandas as pd
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import bisect
+import re
+from functools import lru_cache
 
 # Initialize Dash app with Bootstrap dark theme
 dbc_css = "https://cdn.jsdelivr.net/gh/AnnMarieW/dash-bootstrap-templates/dbc.min.css"
@@ -21,11 +25,14 @@ load_figure_template("SLATE")
 # Load and preprocess data
 df = pd.read_csv('https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-51/ors-limited-dataset.csv')
 
-# Filter for sitting and standing jobs
-df = df[
-    (df['ESTIMATE TEXT'] == 'Hours of the day that workers were required to sit, mean') | 
-    (df['ESTIMATE TEXT'] == 'Hours of the day that workers were required to stand, mean')
-]
+# ORS estimate types used by the dashboard, by short name; adding an entry adds a column
+ESTIMATE_TYPES = {
+    'sit': 'Hours of the day that workers were required to sit, mean',
+    'stand': 'Hours of the day that workers were required to stand, mean',
+}
+
+# Filter for the estimate types above
+df = df[df['ESTIMATE TEXT'].isin(ESTIMATE_TYPES.values())]
 
 # Remove occupations with glitches
 df = df[
@@ -36,9 +43,66 @@ df = df[
 # Convert 'ESTIMATE' column to numeric
 df["ESTIMATE"] = pd.to_numeric(df["ESTIMATE"], errors='coerce')
 
-# Separate data for sitting and standing
-df_standing = df[df['ESTIMATE TEXT'] == 'Hours of the day that workers were required to stand, mean']
-df_sitting = df[df['ESTIMATE TEXT'] == 'Hours of the day that workers were required to sit, mean']
+# One row per occupation with a column per estimate type
+estimates = (
+    df.pivot_table(index='OCCUPATION', columns='ESTIMATE TEXT', values='ESTIMATE', aggfunc='first')
+    .rename(columns={text: name for name, text in ESTIMATE_TYPES.items()})
+    .reindex(columns=list(ESTIMATE_TYPES))
+    .rename_axis(columns=None)
+)
+
+# Occupation/ESTIMATE rows of one estimate type, as create_bar_chart expects them
+def estimate_rows(estimate_type, occupations):
+    values = estimates.loc[occupations, estimate_type].dropna()
+    return pd.DataFrame({'OCCUPATION': values.index, 'ESTIMATE': values.to_numpy()})
+
+# Top 10 occupations per estimate type, sorted in ascending order by ESTIMATE
+top_estimates = {
+    estimate_type: estimate_rows(estimate_type, estimates[estimate_type].nsmallest(10).index)
+    for estimate_type in ESTIMATE_TYPES
+}
+
+# Number of occupations offered per search
+MAX_OCCUPATION_OPTIONS = 20
+
+# Occupation names sorted case-insensitively, for prefix search on the whole name
+occupations = sorted(estimates.index, key=str.lower)
+occupation_keys = [occupation.lower() for occupation in occupations]
+
+# Word -> positions in occupations, with the words sorted for prefix search
+occupation_tokens = {}
+for position, key in enumerate(occupation_keys):
+    for token in set(re.findall(r"[a-z0-9]+", key)):
+        occupation_tokens.setdefault(token, []).append(position)
+sorted_tokens = sorted(occupation_tokens)
+
+# Positions of the entries of a sorted list that start with prefix
+def prefix_range(sorted_keys, prefix):
+    start = bisect.bisect_left(sorted_keys, prefix)
+    stop = bisect.bisect_left(sorted_keys, prefix + '\uffff')
+    return start, stop
+
+# Occupations whose name starts with the query, then those with a word starting with every query word
+def search_occupations(query, limit=MAX_OCCUPATION_OPTIONS):
+    query = query.strip().lower()
+    start, stop = prefix_range(occupation_keys, query)
+    matches = list(range(start, min(stop, start + limit)))
+
+    words = re.findall(r"[a-z0-9]+", query)
+    if words and len(matches) < limit:
+        candidates = None
+        for word in words:
+            token_start, token_stop = prefix_range(sorted_tokens, word)
+            word_matches = {
+                position
+                for token in sorted_tokens[token_start:token_stop]
+                for position in occupation_tokens[token]
+            }
+            candidates = word_matches if candidates is None else candidates & word_matches
+        seen = set(matches)
+        matches += [position for position in sorted(candidates) if position not in seen][:limit - len(matches)]
+
+    return [occupations[position] for position in matches]
 
 # Helper function to create bar charts
 def create_bar_chart(data, title, color_scale, cmin, cmax, icon_html):
@@ -71,6 +135,53 @@ def create_bar_chart(data, title, color_scale, cmin, cmax, icon_html):
     )
     return fig
 
+# Both figures and both KPI texts for a selection (None for the top 10 views)
+def create_outputs(selected_occupations):
+    # Filter data based on selected occupations, default to top 10
+    if selected_occupations:
+        selected_occupations = estimates.index.intersection(selected_occupations)
+        filtered_standing = estimate_rows('stand', selected_occupations)
+        filtered_sitting = estimate_rows('sit', selected_occupations)
+    else:
+        # Top 10 occupations for both sitting and standing, precomputed at startup
+        filtered_standing = top_estimates['stand']
+        filtered_sitting = top_estimates['sit']
+
+    # Create the graph for standing jobs with reversed title (Top 10 Sitting Jobs)
+    graph_figure_standing = create_bar_chart(
+        filtered_standing, 
+        "Top 10 Sitting Jobs",  # Reversed title
+        ['pink', 'magenta'], 
+        cmin=0, 
+        cmax=8, 
+        icon_html="🪑" 
+    )
+
+    # Create the graph for sitting jobs with reversed title (Top 10 Standing Jobs)
+    graph_figure_sitting = create_bar_chart(
+        filtered_sitting, 
+        "Top 10 Standing Jobs",  # Reversed title
+        ['lightblue', 'blue'], 
+        cmin=0, 
+        cmax=9, 
+        icon_html="🧍" 
+    )
+
+    # Calculate total standing hours and sitting hours
+    total_standing_hours = filtered_standing['ESTIMATE'].sum()
+    total_sitting_hours = filtered_sitting['ESTIMATE'].sum()
+
+    # Figures and KPI texts for the outputs
+    return graph_figure_standing, graph_figure_sitting, f"{total_sitting_hours:.2f} Hours", f"{total_standing_hours:.2f} Hours"
+
+# Outputs for the no-selection view, built once and embedded in the layout
+default_outputs = create_outputs(None)
+
+# Recent multi-select combinations, shared across users
+@lru_cache(maxsize=128)
+def cached_outputs(selected_occupations):
+    return create_outputs(list(selected_occupations))
+
 # Create the layout for the app
 app.layout = dbc.Container([
     html.H1("Top Jobs for Standing and Sitting", style={'textAlign': 'center', 'color': 'white'}),
@@ -82,7 +193,8 @@ app.layout = dbc.Container([
             html.H6("Select Occupation /not only form the TOP 10/", style={'color': 'white'}),
             dcc.Dropdown(
                 id='occupation-dropdown',
-                options=[{'label': occupation, 'value': occupation} for occupation in df['OCCUPATION'].unique()],
+                options=[],  # Filled from the search index as the user types
+                placeholder="Type to search occupations",
                 multi=True,  # Allow multi-selection
                 style={'width': '70%'}
             ),
@@ -96,7 +208,7 @@ app.layout = dbc.Container([
             dbc.Card([ 
                 dbc.CardBody([ 
                     html.H3("Standing Hours", className="card-title", style={'textAlign': 'center'}),
-                    html.H5(id='kpi-standing-hours', className="text-center", style={'color': 'white'})
+                    html.H5(default_outputs[3], id='kpi-standing-hours', className="text-center", style={'color': 'white'})
                 ])
             ], className="text-center")
         ], xs=12, sm=6, md=4, lg=3, xl=2),
@@ -104,7 +216,7 @@ app.layout = dbc.Container([
             dbc.Card([ 
                 dbc.CardBody([ 
                     html.H3("Sitting Hours", className="card-title", style={'textAlign': 'center'}),
-                    html.H5(id='kpi-sitting-hours', className="text-center", style={'color': 'white'})
+                    html.H5(default_outputs[2], id='kpi-sitting-hours', className="text-center", style={'color': 'white'})
                 ])
             ], className="text-center")
         ], xs=12, sm=6, md=4, lg=3, xl=2)
@@ -117,7 +229,7 @@ app.layout = dbc.Container([
             dcc.Loading(
                 type="circle", 
                 children=[
-                    dcc.Graph(id='graph-sitting', style={'height': '60vh'})  # Graph for sitting jobs
+                    dcc.Graph(id='graph-sitting', figure=default_outputs[1], style={'height': '60vh'})  # Graph for sitting jobs
                 ]
             )
         ], xs=12, sm=12, md=6, lg=6, xl=6),  # Responsive widths for graphs
@@ -126,57 +238,40 @@ app.layout = dbc.Container([
             dcc.Loading(
                 type="circle", 
                 children=[
-                    dcc.Graph(id='graph-standing', style={'height': '60vh'})  # Graph for standing jobs
+                    dcc.Graph(id='graph-standing', figure=default_outputs[0], style={'height': '60vh'})  # Graph for standing jobs
                 ]
             )
         ], xs=12, sm=12, md=6, lg=6, xl=6),  # Responsive widths for graphs
     ], justify="center", align="center"),
 ], fluid=True)
 
+# Define callback to answer dropdown searches with the top matching occupations
+@app.callback(
+    Output('occupation-dropdown', 'options'),
+    [Input('occupation-dropdown', 'search_value')],
+    [State('occupation-dropdown', 'value')]
+)
+def update_occupation_options(search_value, selected_occupations):
+    if not search_value:
+        raise PreventUpdate
+    # Keep the current selection among the options so it stays displayed
+    selected_occupations = selected_occupations or []
+    matches = [occupation for occupation in search_occupations(search_value) if occupation not in selected_occupations]
+    return [{'label': occupation, 'value': occupation} for occupation in selected_occupations + matches]
+
 # Define callback to update graphs and KPI based on dropdown selection
 @app.callback(
     [Output('graph-standing', 'figure'),
      Output('graph-sitting', 'figure'),
      Output('kpi-sitting-hours', 'children'),
      Output('kpi-standing-hours', 'children')],
-    [Input('occupation-dropdown', 'value')]
+    [Input('occupation-dropdown', 'value')],
+    prevent_initial_call=True  # The layout already holds the default figures and KPIs
 )
 def update_graphs(selected_occupations):
-    # Filter data based on selected occupations, default to top 10
-    if selected_occupations:
-        filtered_standing = df_standing[df_standing['OCCUPATION'].isin(selected_occupations)]
-        filtered_sitting = df_sitting[df_sitting['OCCUPATION'].isin(selected_occupations)]
-    else:
-        # Get top 10 occupations for both sitting and standing, sorted in ascending order by ESTIMATE
-        filtered_standing = df_standing.nsmallest(10, 'ESTIMATE')
-        filtered_sitting = df_sitting.nsmallest(10, 'ESTIMATE')
-
-    # Create the graph for standing jobs with reversed title (Top 10 Sitting Jobs)
-    graph_figure_standing = create_bar_chart(
-        filtered_standing, 
-        "Top 10 Sitting Jobs",  # Reversed title
-        ['pink', 'magenta'], 
-        cmin=0, 
-        cmax=8, 
-        icon_html="🪑" 
-    )
-
-    # Create the graph for sitting jobs with reversed title (Top 10 Standing Jobs)
-    graph_figure_sitting = create_bar_chart(
-        filtered_sitting, 
-        "Top 10 Standing Jobs",  # Reversed title
-        ['lightblue', 'blue'], 
-        cmin=0, 
-        cmax=9, 
-        icon_html="🧍" 
-    )
-
-    # Calculate total standing hours and sitting hours
-    total_standing_hours = filtered_standing['ESTIMATE'].sum()
-    total_sitting_hours = filtered_sitting['ESTIMATE'].sum()
-
-    # Update KPI for hours
-    return graph_figure_standing, graph_figure_sitting, f"{total_sitting_hours:.2f} Hours", f"{total_standing_hours:.2f} Hours"
+    if not selected_occupations:
+        return default_outputs
+    return cached_outputs(tuple(sorted(selected_occupations)))
 
 # Run the app
 if __name__ == '__main__':
@@ -1,170 +1,310 @@
+import dash
 from dash import Dash, dcc, html
 import dash_bootstrap_components as dbc
-import pandas as pd
+import flask
+import hashlib
+import numpy as np
+import os
 import plotly.graph_objects as go
+import sys
 
-# Load the dataset from the GitHub URL
-url = "https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-52/SaaS-businesses-NYSE-NASDAQ.csv"
-data = pd.read_csv(url)
+# Dataset release the figure is built from; bump it when a new CSV is published
+DATA_URL = "https://raw.githubusercontent.com/plotly/Figure-Friday/refs/heads/main/2024/week-52/SaaS-businesses-NYSE-NASDAQ.csv"
+DATASET_VERSION = os.environ.get('SAAS_DATASET_VERSION', '2024-week-52')
 
-# Clean and preprocess the data
-data['Annualized Revenue'] = data['Annualized Revenue'].str.replace('[$,]', '', regex=True).astype(float)
-data['Last Quarter Revenue'] = data['Last Quarter Revenue'].str.replace('[$,]', '', regex=True).astype(float)
-data['YoY Growth%'] = data['YoY Growth%'].str.replace('%', '', regex=True).astype(float)
+# Rendered figure JSON and screener index, one file each per dataset version
+CACHE_DIR = '.data_cache'
+FIGURE_PATH = os.path.join(CACHE_DIR, f"saas-figure-{DATASET_VERSION}.json")
+INDEX_PATH = os.path.join(CACHE_DIR, f"saas-index-{DATASET_VERSION}.npz")
+FIGURE_ROUTE = f"figures/saas-{DATASET_VERSION}.json"
 
-# Select the top 10 companies by Annualized Revenue
-top_companies = data.nlargest(10, 'Annualized Revenue')
+# Metrics the screener can rank by (those missing from the CSV are skipped), and the year column
+SCREENER_METRICS = [
+    'Annualized Revenue', 'Last Quarter Revenue', 'YoY Growth%', 'Market Cap',
+    'Annualized EBITDA', 'Annualized Net Income', 'Revenue Multiple', 'Stock Price'
+]
+YEAR_COLUMN = 'Year Founded'
+DEFAULT_METRIC = 'Annualized Revenue'
+DEFAULT_TOP_N = 10
 
-# Extract necessary data
-companies = top_companies['Company']
-last_quarter_revenue = top_companies['Last Quarter Revenue']
-yoy_growth = top_companies['YoY Growth%']
+# Clean the dataset and build the screener index; pandas is only needed here
+def prepare_index():
+    import pandas as pd
 
-# Create the Dash app
-app = Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
+    # Load the dataset from the GitHub URL
+    data = pd.read_csv(DATA_URL)
 
-# Create the figure
-fig = go.Figure()
-
-# Add bar chart for Last Quarter Revenue with gradient colors
-fig.add_trace(
-    go.Bar(
-        x=companies,
-        y=last_quarter_revenue,
-        name="Last Quarter Revenue",
-        marker=dict(
-            color="green",
-            showscale=False
-        ),
+    # Clean and preprocess the data
+    data['Annualized Revenue'] = data['Annualized Revenue'].str.replace('[$,]', '', regex=True).astype(float)
+    data['Last Quarter Revenue'] = data['Last Quarter Revenue'].str.replace('[$,]', '', regex=True).astype(float)
+    data['YoY Growth%'] = data['YoY Growth%'].str.replace('%', '', regex=True).astype(float)
+    metrics = [metric for metric in SCREENER_METRICS if metric in data.columns]
+    for metric in metrics:
+        if not pd.api.types.is_numeric_dtype(data[metric]):
+            data[metric] = pd.to_numeric(data[metric].str.replace('[$,%x]', '', regex=True), errors='coerce')
+    years = pd.to_numeric(data[YEAR_COLUMN], errors='coerce') if YEAR_COLUMN in data.columns else pd.Series(np.nan, index=data.index)
+
+    # Rows of every metric from largest to smallest value (ties keep file order, missing values last)
+    values = data[metrics].to_numpy(dtype=np.float64)
+    ranks = np.argsort(-values, axis=0, kind='stable').T
+
+    # Rows sorted by founding year, for range filters
+    year_order = np.argsort(years.to_numpy(dtype=np.float64), kind='stable')
+
+    return {
+        'companies': data['Company'].to_numpy(dtype=str),
+        'metrics': np.array(metrics),
+        'values': values,
+        'ranks': ranks,
+        'valid_counts': np.isfinite(values).sum(axis=0),
+        'year_order': year_order,
+        'years_sorted': years.to_numpy(dtype=np.float64)[year_order],
+    }
+
+# Rows of the top_n companies by metric, founded within [year_min, year_max]
+def screener_query(metric, top_n=DEFAULT_TOP_N, year_min=None, year_max=None):
+    column = metric_columns[metric]
+    ranked = ranks[column][:valid_counts[column]]
+    if year_min is None and year_max is None:
+        return ranked[:top_n]
+
+    # Companies in the year range, from the sorted year column
+    lo = 0 if year_min is None else np.searchsorted(years_sorted, year_min, side='left')
+    hi = np.searchsorted(years_sorted, np.inf if year_max is None else year_max, side='right')
+    in_range = np.zeros(len(companies), dtype=bool)
+    in_range[year_order[lo:hi]] = True
+    return ranked[in_range[ranked]][:top_n]
+
+# Rows with the smallest and largest metric value among picks, read from the precomputed ranks
+def min_max_rows(picks, metric):
+    column = metric_columns[metric]
+    positions = rank_positions[column][picks]
+    valid = positions < valid_counts[column]
+    if not valid.any():
+        return None
+    return picks[valid][np.argmax(positions[valid])], picks[valid][np.argmin(positions[valid])]
+
+# Bar and line figure for the picked companies
+def create_figure(picks, metric=DEFAULT_METRIC):
+    names = companies[picks]
+    last_quarter_revenue = metric_values('Last Quarter Revenue')
+    yoy_growth = metric_values('YoY Growth%')
+
+    # Create the figure
+    fig = go.Figure()
+
+    # Add bar chart for Last Quarter Revenue with gradient colors
+    fig.add_trace(
+        go.Bar(
+            x=names,
+            y=last_quarter_revenue[picks],
+            name="Last Quarter Revenue",
+            marker=dict(
+                color="green",
+                showscale=False
+            ),
+        )
     )
-)
 
-# Add line chart for YoY Growth%
-fig.add_trace(
-    go.Scatter(
-        x=companies,
-        y=yoy_growth,
-        name="YoY Growth%",
-        mode="lines+markers",
-        line=dict(color="lightblue", width=3),
-        marker=dict(size=10, color="lightblue"),
+    # Add line chart for YoY Growth%
+    fig.add_trace(
+        go.Scatter(
+            x=names,
+            y=yoy_growth[picks],
+            name="YoY Growth%",
+            mode="lines+markers",
+            line=dict(color="lightblue", width=3),
+            marker=dict(size=10, color="lightblue"),
+        )
     )
-)
 
-# Min and Max annotations for "Last Quarter Revenue"
-min_revenue_idx = last_quarter_revenue.idxmin()
-max_revenue_idx = last_quarter_revenue.idxmax()
-
-# Min and Max annotations for "YoY Growth%"
-min_growth_idx = yoy_growth.idxmin()
-max_growth_idx = yoy_growth.idxmax()
-
-# Add annotations for min and max values
-fig.update_layout(
-    title="Last Quarter Revenue and YoY Growth% for Top 10 SaaS Companies",
-    title_font=dict(size=24, color="white"),  # White title font color
-    plot_bgcolor="black",  # Dark background
-    paper_bgcolor="black",  # Paper background color (for surrounding area)
-    xaxis=dict(
-        title="", 
-        tickangle=-15,
-        titlefont=dict(size=20, color="white"),  # Larger font size for X-axis title
-        tickfont=dict(size=20, color="white"),  # Larger font size for X-axis ticks
-    ),
-    yaxis=dict(
-        title="Last Quarter Revenue (in billions)",
-        titlefont=dict(size=20, color="lightgreen"),  # Larger font size for Y-axis title
-        tickfont=dict(size=20, color="lightgreen"),  # Larger font size for Y-axis ticks
-        showgrid=False,  # No gridlines
-    ),
-    yaxis2=dict(
-        title="YoY Growth% (%)",
-        titlefont=dict(size=20, color="lightblue"),  # Larger font size for Y2-axis title
-        tickfont=dict(size=16, color="lightblue"),  # Larger font size for Y2-axis ticks
-        overlaying="y",
-        side="right",
-        showgrid=False,  # No gridlines
-    ),
-    legend=dict(x=0.5, y=-0.3, orientation="h", font=dict(size=16, color="white")),
-    height=1080,  # Full HD height
-    width=1920,   # Full HD width
-    barmode="group",
-    annotations=[
-        # Min/Max Annotations for Last Quarter Revenue
-        dict(
-            x=companies[min_revenue_idx],
-            y=last_quarter_revenue[min_revenue_idx],
-            xanchor="center",
-            yanchor="bottom",
-            text=f"Min Revenue: {last_quarter_revenue[min_revenue_idx]:,.2f}",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            ax=0,
-            ay=-40,
-            font=dict(size=18, color="green"),  # Increased font size
-            bgcolor="lightgreen",  # Dark background with transparency
-            bordercolor="green",  # Border color
-            borderwidth=2,  # Border width
-            opacity=1  # Fully opaque
-        ),
-        dict(
-            x=companies[max_revenue_idx],
-            y=last_quarter_revenue[max_revenue_idx],
-            xanchor="center",
-            yanchor="bottom",
-            text=f"Max Revenue: {last_quarter_revenue[max_revenue_idx]:,.2f}",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            ax=0,
-            ay=-40,
-            font=dict(size=18, color="green"),  # Increased font size
-            bgcolor="lightgreen",  # Dark background with transparency
-            bordercolor="green",  # Border color
-            borderwidth=2,  # Border width
-            opacity=1  # Fully opaque
+    # Min and Max annotations for "Last Quarter Revenue" and "YoY Growth%"
+    revenue_rows = min_max_rows(picks, 'Last Quarter Revenue')
+    growth_rows = min_max_rows(picks, 'YoY Growth%')
+
+    annotations = []
+    # Min/Max Annotations for Last Quarter Revenue
+    if revenue_rows is not None:
+        min_revenue_row, max_revenue_row = revenue_rows
+        annotations += [
+            dict(
+                x=companies[min_revenue_row],
+                y=last_quarter_revenue[min_revenue_row],
+                xanchor="center",
+                yanchor="bottom",
+                text=f"Min Revenue: {last_quarter_revenue[min_revenue_row]:,.2f}",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                ax=0,
+                ay=-40,
+                font=dict(size=18, color="green"),  # Increased font size
+                bgcolor="lightgreen",  # Dark background with transparency
+                bordercolor="green",  # Border color
+                borderwidth=2,  # Border width
+                opacity=1  # Fully opaque
+            ),
+            dict(
+                x=companies[max_revenue_row],
+                y=last_quarter_revenue[max_revenue_row],
+                xanchor="center",
+                yanchor="bottom",
+                text=f"Max Revenue: {last_quarter_revenue[max_revenue_row]:,.2f}",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                ax=0,
+                ay=-40,
+                font=dict(size=18, color="green"),  # Increased font size
+                bgcolor="lightgreen",  # Dark background with transparency
+                bordercolor="green",  # Border color
+                borderwidth=2,  # Border width
+                opacity=1  # Fully opaque
+            )
+        ]
+    # Min/Max Annotations for YoY Growth
+    if growth_rows is not None:
+        min_growth_row, max_growth_row = growth_rows
+        annotations += [
+            dict(
+                x=companies[min_growth_row],
+                y=yoy_growth[min_growth_row],
+                xanchor="center",
+                yanchor="bottom",
+                text=f"Min Growth: {yoy_growth[min_growth_row]:.2f}%",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                ax=0,
+                ay=40,
+                font=dict(size=18, color="blue"),  # Increased font size
+                bgcolor="lightblue",  # Dark background with transparency
+                bordercolor="blue",  # Border color
+                borderwidth=2,  # Border width
+                opacity=1  # Fully opaque
+            ),
+            dict(
+                x=companies[max_growth_row],
+                y=yoy_growth[max_growth_row],
+                xanchor="center",
+                yanchor="bottom",
+                text=f"Max Growth: {yoy_growth[max_growth_row]:.2f}%",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                ax=0,
+                ay=-640,
+                font=dict(size=18, color="blue"),  # Increased font size
+                bgcolor="lightblue",  # Dark background with transparency
+                bordercolor="blue",  # Border color
+                borderwidth=2,  # Border width
+                opacity=1  # Fully opaque
+            )
+        ]
+
+    # Add annotations for min and max values
+    fig.update_layout(
+        title=f"Last Quarter Revenue and YoY Growth% for Top {len(picks)} SaaS Companies"
+              + (f" by {metric}" if metric != DEFAULT_METRIC else ""),
+        title_font=dict(size=24, color="white"),  # White title font color
+        plot_bgcolor="black",  # Dark background
+        paper_bgcolor="black",  # Paper background color (for surrounding area)
+        xaxis=dict(
+            title="", 
+            tickangle=-15,
+            titlefont=dict(size=20, color="white"),  # Larger font size for X-axis title
+            tickfont=dict(size=20, color="white"),  # Larger font size for X-axis ticks
         ),
-        # Min/Max Annotations for YoY Growth
-        dict(
-            x=companies[min_growth_idx],
-            y=yoy_growth[min_growth_idx],
-            xanchor="center",
-            yanchor="bottom",
-            text=f"Min Growth: {yoy_growth[min_growth_idx]:.2f}%",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            ax=0,
-            ay=40,
-            font=dict(size=18, color="blue"),  # Increased font size
-            bgcolor="lightblue",  # Dark background with transparency
-            bordercolor="blue",  # Border color
-            borderwidth=2,  # Border width
-            opacity=1  # Fully opaque
+        yaxis=dict(
+            title="Last Quarter Revenue (in billions)",
+            titlefont=dict(size=20, color="lightgreen"),  # Larger font size for Y-axis title
+            tickfont=dict(size=20, color="lightgreen"),  # Larger font size for Y-axis ticks
+            showgrid=False,  # No gridlines
         ),
-        dict(
-            x=companies[max_growth_idx],
-            y=yoy_growth[max_growth_idx],
-            xanchor="center",
-            yanchor="bottom",
-            text=f"Max Growth: {yoy_growth[max_growth_idx]:.2f}%",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            ax=0,
-            ay=-640,
-            font=dict(size=18, color="blue"),  # Increased font size
-            bgcolor="lightblue",  # Dark background with transparency
-            bordercolor="blue",  # Border color
-            borderwidth=2,  # Border width
-            opacity=1  # Fully opaque
+        yaxis2=dict(
+            title="YoY Growth% (%)",
+            titlefont=dict(size=20, color="lightblue"),  # Larger font size for Y2-axis title
+            tickfont=dict(size=16, color="lightblue"),  # Larger font size for Y2-axis ticks
+            overlaying="y",
+            side="right",
+            showgrid=False,  # No gridlines
         ),
-    ]
-)
+        legend=dict(x=0.5, y=-0.3, orientation="h", font=dict(size=16, color="white")),
+        height=1080,  # Full HD height
+        width=1920,   # Full HD width
+        barmode="group",
+        annotations=annotations,
+    )
 
-# Attach secondary y-axis for YoY Growth%
-fig.update_traces(yaxis="y2", selector=dict(name="YoY Growth%"))
+    # Attach secondary y-axis for YoY Growth%
+    fig.update_traces(yaxis="y2", selector=dict(name="YoY Growth%"))
+
+    return fig
+
+# Values of one metric for every row
+def metric_values(metric):
+    return values[:, metric_columns[metric]]
+
+# Load the screener index arrays into module globals
+def load_index(index):
+    global companies, metric_names, values, ranks, valid_counts, year_order, years_sorted, metric_columns, rank_positions
+    companies = index['companies']
+    metric_names = [str(metric) for metric in index['metrics']]
+    values = index['values']
+    ranks = index['ranks']
+    valid_counts = index['valid_counts']
+    year_order = index['year_order']
+    years_sorted = index['years_sorted']
+    metric_columns = {metric: column for column, metric in enumerate(metric_names)}
+
+    # Rank of every row for every metric (the inverse of ranks)
+    rank_positions = np.empty_like(ranks)
+    rank_positions[np.arange(len(metric_names))[:, None], ranks] = np.arange(ranks.shape[1])
+
+# Write a cache file atomically
+def write_artifact(path, write):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+# Render the screener index and the default figure JSON for the current dataset version
+def build_artifacts():
+    index = prepare_index()
+    write_artifact(INDEX_PATH, lambda f: np.savez(f, **index))
+    load_index(index)
+    fig = create_figure(screener_query(DEFAULT_METRIC))
+    write_artifact(FIGURE_PATH, lambda f: f.write(fig.to_json().encode()))
+
+# Build the artifacts only when this dataset version has none yet
+if not (os.path.exists(FIGURE_PATH) and os.path.exists(INDEX_PATH)):
+    build_artifacts()
+
+with np.load(INDEX_PATH) as index:
+    load_index(dict(index))
+
+with open(FIGURE_PATH, 'rb') as f:
+    figure_json = f.read()
+figure_etag = hashlib.sha256(figure_json).hexdigest()
+
+# Founding year bounds for the screener controls
+known_years = years_sorted[np.isfinite(years_sorted)]
+first_year = int(known_years[0]) if len(known_years) else 0
+last_year = int(known_years[-1]) if len(known_years) else 0
+
+# Create the Dash app
+app = Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
+
+# Serve the figure with a strong ETag; the URL changes with the dataset version,
+# so browsers may keep it forever and revalidations get a 304. The route sits under the
+# app's own prefix, and the browser gets it through requests_pathname_prefix
+@app.server.route(app.config.routes_pathname_prefix + FIGURE_ROUTE)
+def serve_figure():
+    response = flask.Response(figure_json, mimetype='application/json')
+    response.set_etag(figure_etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(flask.request)
 
 # App layout with centered chart
 app.layout = dbc.Container(
@@ -173,7 +313,7 @@ app.layout = dbc.Container(
             [
                 html.H1(
                     "This visualization compares the top 10 SaaS companies (Year Founded 1987-2007)",
-                
+                    id='saas-title',
                     style={
                         'textAlign': 'center',  # Center align text
                         'color': 'white',  # White text color
@@ -182,7 +322,39 @@ app.layout = dbc.Container(
                         
                     }
                 ),
-                dcc.Graph(figure=fig)
+                # Screener controls: ranking metric, number of companies and founding years
+                dbc.Row(
+                    [
+                        dbc.Col(dcc.Dropdown(
+                            id='screener-metric',
+                            options=metric_names,
+                            value=DEFAULT_METRIC,
+                            clearable=False,
+                            style={'color': 'black'}
+                        ), width=4),
+                        dbc.Col(dcc.Input(
+                            id='screener-top-n',
+                            type='number',
+                            min=1,
+                            max=len(companies),
+                            step=1,
+                            value=DEFAULT_TOP_N,
+                            debounce=True
+                        ), width=2),
+                        dbc.Col(dcc.RangeSlider(
+                            id='screener-years',
+                            min=first_year,
+                            max=last_year,
+                            step=1,
+                            value=[first_year, last_year],
+                            marks=None,
+                            tooltip={'placement': 'bottom', 'always_visible': True}
+                        ), width=6),
+                    ],
+                    style={'width': '1920px', 'marginBottom': '20px'}
+                ),
+                dcc.Graph(id='saas-graph'),
+                dcc.Store(id='figure-url', data=app.get_relative_path('/' + FIGURE_ROUTE))
             ],
             style={
                 'display': 'flex',
@@ -199,6 +371,52 @@ app.layout = dbc.Container(
     }
 )
 
-# Run the app
+# Load the cached figure artifact in the browser
+app.clientside_callback(
+    """
+    async function(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            console.error(`Loading the figure from ${url} failed: ${response.status}`);
+            return window.dash_clientside.no_update;
+        }
+        return response.json();
+    }
+    """,
+    dash.Output('saas-graph', 'figure'),
+    dash.Input('figure-url', 'data')
+)
+
+# Rebuild the figure from the precomputed ranks when the screener controls change;
+# the default query keeps the cached artifact loaded above
+@app.callback(
+    dash.Output('saas-graph', 'figure', allow_duplicate=True),
+    dash.Output('saas-title', 'children'),
+    dash.Input('screener-metric', 'value'),
+    dash.Input('screener-top-n', 'value'),
+    dash.Input('screener-years', 'value'),
+    prevent_initial_call=True
+)
+def update_screener(metric, top_n, year_range):
+    if metric is None or not top_n:
+        raise dash.exceptions.PreventUpdate
+
+    # Only a narrowed year range filters companies (rows without a founding year pass otherwise)
+    year_min, year_max = year_range
+    if year_min <= first_year and year_max >= last_year:
+        year_min = year_max = None
+
+    picks = screener_query(metric, int(top_n), year_min, year_max)
+    founded = years_sorted[np.isin(year_order, picks)]
+    founded = founded[np.isfinite(founded)]
+    title = f"This visualization compares the top {len(picks)} SaaS companies by {metric}"
+    if len(founded):
+        title += f" (Year Founded {int(founded.min())}-{int(founded.max())})"
+    return create_figure(picks, metric), title
+
+# Run the app; `python figurefriday52SaaS.py --build` re-renders the artifacts
 if __name__ == "__main__":
-    app.run_server(debug=True)
+    if '--build' in sys.argv:
+        build_artifacts()
+    else:
+        app.run_server(debug=True)